@@ -1,98 +1,465 @@
 import streamlit as st
 import altair as alt
 import pandas as pd
-import base64
-import time
-import streamlit.components.v1 as components
+import html
+import httpx
 import io
-from services.api import fetch_user_id, fetch_activations, fetch_s2s_data, fetch_chaser_data
+import os
+import re
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from services.api import LOG_TTL, fetch_user_data, fetch_user_years, prefetch_user_data, release_prefetch
 from services.data import (
-    get_points_total,
-    get_most_qsos_activation,
-    count_activations,
-    most_popular_month_with_season,
-    get_percentile_bucket,
-    get_chaser_percentile_bucket,
+    CURRENT_YEAR,
+    UserYearProfile,
+    build_profile,
+    fetch_user_id_honor_roll,
+    freeze_log,
+    get_role_percentile_bucket,
     get_total_elevation_gain,
-    get_qsos_per_band,
-    get_qsos_per_band_chaser,
-    get_qsos_per_mode,
-    get_qsos_per_mode_chaser,
-    get_activator_qso_stats,
-    count_s2s_qsos,
-    count_chaser_qsos,
-    count_unique_summits,
-    fetch_user_id_honor_roll
+    is_empty_profile
 )
+from services.share import get_share_card, share_card_url
+from services.store import get_summary
+from services.telemetry import cache_miss, counted_cache, span, start_export, timed
 
-with open("data/logo.png", "rb") as f:
-    logo = f.read()
+# Years on offer, newest first, and how many years before the chosen one
+# the year-over-year slide compares against
+YEARS = tuple(range(CURRENT_YEAR, CURRENT_YEAR - 5, -1))
+HISTORY_YEARS = 2
+YEAR_OVER_YEAR_METRICS = {
+    "Activator": (("Total Points", "total_points"), ("Total QSOs", "qso_total"), ("Activations", "num_activations")),
+    "Chaser": (("Total Points", "total_points"), ("Total QSOs", "qso_total"), ("Unique Summits", "unique_summits"))
+}
 
-b64_logo = base64.b64encode(logo).decode()
+st.set_page_config(page_title="SOTA Unwrapped", layout="centered")
 
-st.set_page_config(page_title="SOTA Unwrapped 2025", layout="centered")
+# Telemetry files are written by the server only, once per process, keyed by
+# SOTA_WORKER_ID or else the port, which stay the same across restarts
+@st.cache_resource(show_spinner=False)
+def start_telemetry():
+    start_export(os.environ.get("SOTA_WORKER_ID") or st.get_option("server.port"))
+
+start_telemetry()
 
 # -----------------------------
 # Cache API calls
 # -----------------------------
-@st.cache_data(show_spinner=False)
-def fetch_user_id_cached(callsign):
-    return fetch_user_id(callsign)
-
-@st.cache_data(show_spinner=False)
-def fetch_activations_cached(user_id):
-    return fetch_activations(user_id)
-
-@st.cache_data(show_spinner=False)
-def fetch_s2s_data_cached(user_id):
-    return fetch_s2s_data(user_id)
-
-@st.cache_data(show_spinner=False)
-def fetch_chaser_data_cached(user_id):
-    return fetch_chaser_data(user_id)
+# Shared, read-only logs: a hit hands back the same object with no unpickling.
+# The chaser log arrives already counted into its (frozen) profile.
+@counted_cache("user_data")
+@st.cache_resource(show_spinner=False, ttl=LOG_TTL, max_entries=500)
+def fetch_user_data_cached(callsign, user_id, year):
+    cache_miss()
+    user_data = fetch_user_data(callsign, user_id, year)
+    return MappingProxyType({
+        "user_id": user_data["user_id"],
+        "activations": freeze_log(user_data["activations"]),
+        "s2s": freeze_log(user_data["s2s"]),
+        "chaser_profile": user_data["chaser_profile"],
+        "versions": MappingProxyType(user_data["versions"])
+    })
 
 # -----------------------------
 # Cache computation functions
 # -----------------------------
-@st.cache_data(show_spinner=False)
-def get_total_activator_points_cached(activation_data):
-    return get_points_total(activation_data)
+# Keyed by (user_id, year, role, data version): the underscore argument is
+# not hashed, so reruns never walk the log to find the cache entry.
+# Profiles are frozen, so every session can share the same instance.
+# Index-backed metrics are deferred to the slides that show them.
+@counted_cache("profile")
+@st.cache_resource(show_spinner=False, max_entries=1000)
+def get_profile_cached(user_id, year, role, data_version, _user_data):
+    cache_miss()
+    return profile_from_user_data(_user_data, role, year)
+
+# Summaries precomputed by update_honor_roll.py. The year in progress keeps
+# changing, so its summaries are only trusted for SUMMARY_MAX_AGE seconds;
+# after that the live logs are used until the next run.
+SUMMARY_MAX_AGE = 24 * 60 * 60
+
+def summary_max_age(year):
+    return SUMMARY_MAX_AGE if year >= CURRENT_YEAR else None
+
+@counted_cache("stored_profile")
+@st.cache_resource(show_spinner=False, ttl=LOG_TTL, max_entries=5000)
+def get_stored_profile_cached(user_id, year, role):
+    cache_miss()
+    profile_json = get_summary(user_id, year, role, summary_max_age(year))
+    return UserYearProfile.from_json(profile_json) if profile_json else None
+
+def profile_from_user_data(user_data, role, year):
+    if role == "Chaser":
+        return user_data["chaser_profile"]
+    return build_profile(role, user_data["activations"], user_data["s2s"], deferred=True, year=year)
+
+def profile_data_version(user_data, role):
+    versions = user_data["versions"]
+    if role == "Activator":
+        return versions.get("activations"), versions.get("s2s")
+    return versions.get("chaser")
 
-@st.cache_data(show_spinner=False)
-def get_total_s2s_points_cached(s2s_data):
-    return get_points_total(s2s_data)
-
-@st.cache_data(show_spinner=False)
-def get_total_chaser_points_cached(chaser_data):
-    return get_points_total(chaser_data)
-
-@st.cache_data(show_spinner=False)
-def get_most_qsos_cached(activation_data):
-    return get_most_qsos_activation(activation_data)
+# -----------------------------
+# Lazy slide metrics
+# -----------------------------
+# A slide names the metric it "needs"; it is computed on a worker thread the
+# first time it is asked for, normally while the previous slide is on screen.
+# A slide waits at most METRIC_TIMEOUT seconds and then shows its "fallback".
+METRIC_TIMEOUT = 8
+# Metrics that wait on upstream requests; they get their own, larger pool so
+# a slow API never holds up the local lookups of every other session
+NETWORK_METRICS = frozenset({"history"})
+
+@st.cache_resource(show_spinner=False)
+def get_metric_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="slide-metrics")
+
+@st.cache_resource(show_spinner=False)
+def get_network_metric_pool():
+    return ThreadPoolExecutor(max_workers=32, thread_name_prefix="slide-network-metrics")
+
+def load_year_history(callsign, user_id, role, years):
+    # Stored summaries first; the remaining years' logs for this role are
+    # fetched concurrently, and closed years come from the response store,
+    # which keeps them forever
+    stored = {
+        year: get_summary(user_id, year, role, summary_max_age(year)) if user_id is not None else None
+        for year in years
+    }
+    missing = [year for year in years if stored[year] is None]
+    try:
+        fetched = fetch_user_years(callsign, user_id, missing, role) if missing else {}
+    except httpx.HTTPError:
+        # Left out of the comparison rather than shown as an empty year
+        fetched = {}
+
+    history = []
+    for year in years:
+        if stored[year] is not None:
+            profile = UserYearProfile.from_json(stored[year])
+        elif year in fetched:
+            profile = profile_from_user_data(fetched[year], role, year)
+        else:
+            profile = None
+        history.append((year, None if profile is None or is_empty_profile(profile) else profile))
+
+    return tuple(history)
+
+def slide_metric_sources(callsign, user_id, year, profile, activations):
+    # Precomputed summaries already carry the values
+    percentile = lambda: get_role_percentile_bucket(profile.role, profile.total_points, year)
+    total_elevation = lambda: get_total_elevation_gain(activations)
+    if profile.bucket is not None:
+        percentile = lambda: (profile.percentile, profile.bucket)
+    if profile.total_elevation is not None:
+        total_elevation = lambda: profile.total_elevation
+
+    history_years = tuple(range(year - HISTORY_YEARS, year))
+    history = lambda: load_year_history(callsign, user_id, profile.role, history_years)
+
+    return MappingProxyType({"percentile": percentile, "total_elevation": total_elevation, "history": history})
+
+def prefetch_metric(name):
+    futures = st.session_state.metric_futures
+    if name not in futures:
+        pool = get_network_metric_pool() if name in NETWORK_METRICS else get_metric_pool()
+        futures[name] = pool.submit(timed("metric", name)(st.session_state.metric_sources[name]))
+    return futures[name]
+
+def resolve_slide(slide):
+    if "needs" not in slide:
+        return slide
+
+    future = prefetch_metric(slide["needs"])
+    try:
+        result = future.result(timeout=METRIC_TIMEOUT)
+    except Exception:
+        # A slow metric keeps running and shows up on a later rerun; a failed
+        # one is dropped so the next rerun tries it again
+        if future.done():
+            st.session_state.metric_futures.pop(slide["needs"], None)
+        return {**slide, **slide["fallback"]}
+    return {**slide, **slide["fill"](result)}
 
-@st.cache_data(show_spinner=False)
-def get_total_elevation_cached(activation_data):
-    return get_total_elevation_gain(activation_data)
+# -----------------------------
+# Rendering helpers
+# -----------------------------
+# Vega, Vega-Lite and Vega-Embed, vendored as one bundle and served from
+# static/ rather than a CDN. The bundle only renders specs written for its
+# Vega-Lite, so an altair that writes newer ones stops the app right here.
+BUNDLED_VEGALITE_VERSION = "6.4.1"
+VEGA_BUNDLE_URL = f"app/static/vendor/vega-6.2.0-vega-lite-{BUNDLED_VEGALITE_VERSION}-vega-embed-7.0.2.js"
+if alt.VEGALITE_VERSION != BUNDLED_VEGALITE_VERSION:
+    raise RuntimeError(
+        f"altair {alt.__version__} writes Vega-Lite {alt.VEGALITE_VERSION} specs, "
+        f"but the vendored bundle is Vega-Lite {BUNDLED_VEGALITE_VERSION}"
+    )
 
-@st.cache_data(show_spinner=False)
-def get_qsos_per_band_cached(activation_data):
-    return get_qsos_per_band(activation_data)
+def animated_bar_chart(totals, category, color):
+    chart_data = pd.DataFrame(list(totals), columns=[category, "QSOs"])
+    if chart_data.empty:
+        st.write("No QSOs to chart yet.")
+        return
+
+    # One spec is sent; the browser grows the bars in by animating the
+    # "grow" signal from 0 to 1
+    grow = alt.param(name="grow", value=0)
+    chart = alt.Chart(chart_data).mark_bar(color=color).encode(
+        x=alt.X("QSOsAnimated:Q", title="Number of QSOs", scale=alt.Scale(domain=[0, int(chart_data["QSOs"].max())])),
+        y=alt.Y(f"{category}:N", sort=alt.EncodingSortField("QSOs", order="descending"), title=category)
+    ).transform_calculate(
+        QSOsAnimated="datum.QSOs * grow"
+    ).add_params(grow).properties(height=400, width="container")
+
+    st.iframe(f"""
+    <div id="chart" style="width: 100%;"></div>
+    <script src="{VEGA_BUNDLE_URL}"></script>
+    <script>
+    vegaEmbed("#chart", {chart.to_json()}, {{actions: false}}).then(({{view}}) => {{
+        const start = performance.now();
+        const duration = 1000;
+
+        function step(now) {{
+            const t = Math.min((now - start) / duration, 1);
+            view.signal("grow", 1 - Math.pow(1 - t, 3)).run();
+            if (t < 1) requestAnimationFrame(step);
+        }}
+        requestAnimationFrame(step);
+    }});
+    </script>
+    """, height=460)
+
+def _metric_card_html(slide, value_html):
+    return f"""
+    <div class="fade-in-card" style="
+        display: flex;
+        flex-direction: column;
+        justify-content: center;
+        align-items: center;
+        font-family: 'Inter', Arial, Helvetica, sans-serif;
+        background-color:{slide['color']};
+        padding: 20px 30px;
+        border-radius: 20px;
+        text-align: center;
+        color: white;
+        width: 100%;
+        max-width: 600px;
+        margin: auto;
+    ">
+        <h1 style="font-size:60px; margin:0;">
+            {slide['emoji']} {value_html}
+        </h1>
+        <p style="font-size:24px; margin:4px 0 0 0;">
+            {slide['metric']}
+        </p>
+        <p style="font-size:18px; margin-top:10px;">
+            {slide['description']}
+        </p>
+    </div>
+
+    <style>
+    @keyframes fadeInUp {{
+    from {{
+        opacity: 0;
+        transform: translateY(20px);
+    }}
+    to {{
+        opacity: 1;
+        transform: translateY(0);
+    }}
+    }}
+
+    .fade-in-card {{
+        animation: fadeInUp 0.8s ease-out;
+    }}
+    </style>
+    """
+
+def metric_card(slide):
+    st.iframe(_metric_card_html(slide, slide["value"]), height=250)
+
+def count_up_card(slide, suffix=""):
+    # The final value is sent once; the browser counts up to it
+    st.iframe(_metric_card_html(slide, f'<span id="count">0{suffix}</span>') + f"""
+    <script>
+    const target = {int(slide["value"])};
+    const counter = document.getElementById("count");
+    const start = performance.now();
+    const duration = 1200;
+
+    function step(now) {{
+        const t = Math.min((now - start) / duration, 1);
+        counter.textContent = Math.floor(target * t).toLocaleString("en-US") + "{suffix}";
+        if (t < 1) requestAnimationFrame(step);
+    }}
+    requestAnimationFrame(step);
+    </script>
+    """, height=250)
+
+def share_card(callsign, role, year, metrics):
+    # Rendered to PNG once per (callsign, role, year, metrics); the browser
+    # loads it from the static file server, so no image bytes go over the
+    # session's websocket. The image and links share one relative URL, which
+    # also holds under server.baseUrlPath.
+    key, _ = get_share_card(callsign, role, year, metrics)
+    url = share_card_url(key)
+    file_name = f"sota-unwrapped-{year}-{callsign.replace('/', '-')}-{role.lower()}.png"
+
+    st.markdown(
+        f'<img src="{url}" width="420" alt="{html.escape(f"{callsign} {year} SOTA {role} Unwrapped card")}">\n\n'
+        f'<a href="{url}" download="{html.escape(file_name)}">Download your card</a> · '
+        f'<a href="{url}" target="_blank">Link to your card</a>',
+        unsafe_allow_html=True
+    )
 
-@st.cache_data(show_spinner=False)
-def get_qsos_per_mode_cached(activation_data):
-    return get_qsos_per_mode(activation_data)
+def year_over_year(history):
+    if history is None:
+        return
 
-@st.cache_data(show_spinner=False)
-def get_qsos_per_band_chaser_cached(chaser_data):
-    return get_qsos_per_band_chaser(chaser_data)
+    years = [(year, profile) for year, profile in history if profile is not None]
+    if len(years) < 2:
+        st.write("No earlier logs to compare with yet.")
+        return
 
-@st.cache_data(show_spinner=False)
-def get_qsos_per_mode_chaser_cached(chaser_data):
-    return get_qsos_per_mode_chaser(chaser_data)
+    columns = st.columns(len(years))
+    for column, (year, profile), previous in zip(columns, years, [None] + years[:-1]):
+        with column:
+            st.markdown(f"#### {year}")
+            for label, field in YEAR_OVER_YEAR_METRICS[profile.role]:
+                value = getattr(profile, field)
+                delta = None if previous is None else value - getattr(previous[1], field)
+                st.metric(label, f"{value:,}", delta=delta)
 
-@st.cache_data(show_spinner=False)
-def get_activator_qso_stats_cached(activation_data):
-    return get_activator_qso_stats(activation_data)
+# -----------------------------
+# Slides content
+# -----------------------------
+def build_deck(callsign, role, year, profile):
+    # One definition for every deck; S2S and role-specific slides are
+    # switched in from the profile
+    activator = role == "Activator"
+    season = profile.season
+
+    points = {
+        "title": f"{callsign}'s {year} SOTA {role} Unwrapped ✨",
+        "type": "metric",
+        "metric": "Total Points",
+        "value": profile.total_points,
+        "emoji": "🏆",
+        "color": "#1DB954",
+        "description": f"You did {profile.num_activations} activations this year" if activator else "That's a lot of happy Activators!"
+    }
+    highest_activation = {
+        "title": "Highest QSO Activation 📡",
+        "type": "metric",
+        "metric": profile.most_qsos_summit,
+        "value": profile.most_qsos,
+        "emoji": "⚡",
+        "color": "#FF6F61",
+        "description": "QSOs made on this summit"
+    }
+    total_qsos = {
+        "title": "Total QSOs 📡",
+        "type": "metric",
+        "metric": "Total QSOs this year",
+        "value": profile.qso_total,
+        "emoji": "🗣️",
+        "color": "#7B3FE4",
+        "description": f"Average {profile.average_qsos:.2f} QSOs per activation" if activator else f"You worked {profile.unique_summits} unique summits"
+    }
+    s2s = {
+        "title": "S2S facts 🏔️↔️🏔️",
+        "type": "metric",
+        "metric": "Total S2S QSOs this year",
+        "value": profile.num_s2s_qsos,
+        "emoji": "🔺",
+        "color": "#C2410C",
+        "description": f"You made {profile.total_s2s_points} S2S points"
+    }
+    busiest_month = {
+        "title": "Your Busiest Month 📆",
+        "type": "metric",
+        "metric": profile.popular_month,
+        "value": f"{profile.popular_month_count} activations",
+        "emoji": "🌞" if season=="Summer" else "❄️" if season=="Winter" else "🌄",
+        "color": "#FFA500",
+        "description": f"{season} vibes for your activations!"
+    }
+    band_chart = {
+        "title": "QSOs per Band 📶",
+        "type": "band_chart",
+        "chart_data": profile.band_totals,
+        "description": "Here’s how your QSOs were distributed across bands:"
+    }
+    percentile = {
+        "title": "Percentile & Rank 🙌",
+        "type": "metric",
+        "needs": "percentile",
+        "fill": lambda result: {
+            "metric": f"{result[1]} percentile" if result[0] is not None else f"No {year} honor roll data",
+            "value": f"{result[0]:.1f}%" if result[0] is not None else "–"
+        },
+        "fallback": {"metric": "Percentile unavailable right now", "value": "–"},
+        "emoji": "🙌",
+        "color": "#FFD700",
+        "description": f"Compared to all {role.lower()}s"
+    }
+    summit_height = {
+        "title": "Cumulative height of summits activated 🏔️",
+        "type": "metric",
+        "metric": "Cumulative summit height",
+        "needs": "total_elevation",
+        "fill": lambda total_elevation: {"value": total_elevation},
+        "fallback": {"metric": "Cumulative summit height unavailable right now", "value": "–"},
+        "emoji": "⛰️",
+        "color": "#00BFFF",
+        "description": "Reach for the stars"
+    }
+    favourite_band = {
+        "title": "Your Favourite Band 🥁",
+        "type": "metric",
+        "metric": f"it accounted for {profile.most_popular_band_qsos} QSOs",
+        "value": f"{profile.most_popular_band}",
+        "emoji": "🤘",
+        "color": "#00A8A8",
+        "description": "Yeah, not that type of band..."
+    }
+    mode_chart = {
+        "title": "QSOs per Mode 📶",
+        "type": "mode_chart",
+        "chart_data": profile.mode_totals,
+        "description": "Here’s how your QSOs were distributed across modes:"
+    }
+    history = {
+        "title": "Year over Year 📈",
+        "type": "year_over_year",
+        "needs": "history",
+        "fill": lambda history: {"history": history + ((year, profile),)},
+        "fallback": {"history": None, "description": "We couldn't load your earlier years just now. Please try again later."},
+        "description": f"How your {year} compares with the years before:"
+    }
+    share = {
+        "title": f"Your SOTA {role} Unwrapped",
+        "type": "share",
+        "role": role,
+        "year": year,
+        "metrics": (
+            ("Favourite Band", profile.most_popular_band),
+            ("Total QSOs", profile.qso_total),
+            ("Total Points", profile.total_points),
+            ("Total Activations", profile.num_activations) if activator else ("Favourite Mode", profile.most_popular_mode)
+        )
+    }
+
+    if activator:
+        slides = [points, highest_activation, total_qsos]
+        if profile.num_s2s_qsos:
+            slides.append(s2s)
+        slides += [busiest_month, band_chart, percentile, summit_height, favourite_band, mode_chart, history, share]
+    else:
+        slides = [points, total_qsos, percentile, band_chart, favourite_band, mode_chart, history, share]
+
+    return tuple(MappingProxyType(slide) for slide in slides)
 
 # -----------------------------
 # Session state
@@ -103,558 +470,167 @@ if "slide" not in st.session_state:
     st.session_state.slide = 0
 if "wrapped_type" not in st.session_state:
     st.session_state.wrapped_type = 0
+if "year" not in st.session_state:
+    st.session_state.year = CURRENT_YEAR
 
 # -----------------------------
 # Slide navigation
 # -----------------------------
 def next_slide():
-    if st.session_state.slide < len(slides) - 1:
+    if st.session_state.slide < len(st.session_state.deck) - 1:
         st.session_state.slide += 1
 
 def prev_slide():
     if st.session_state.slide > 0:
         st.session_state.slide -= 1
 
+# -----------------------------
+# Speculative prefetch
+# -----------------------------
+CALLSIGN_PATTERN = re.compile(r"^([A-Z0-9]{1,4}/)?[A-Z0-9]{1,3}[0-9][A-Z0-9]{0,4}(/[A-Z0-9]{1,4})?$")
+
+class PrefetchClaim:
+    # A session's hold on a prefetch. Kept only in session_state, so when
+    # Streamlit drops a closed session the claim is released along with it.
+    def __init__(self, callsign, year, future):
+        self.callsign = callsign
+        self.year = year
+        self.release = weakref.finalize(self, release_prefetch, callsign, future, year)
+
+def release_session_prefetch():
+    claim = st.session_state.get("prefetch")
+    if claim is not None:
+        claim.release()
+        st.session_state.prefetch = None
+
+def prefetch_callsign():
+    # Both roles' logs start downloading as soon as a plausible callsign is
+    # entered, so whichever Start button is pressed finds them warm. A
+    # changed callsign releases the previous one's fetch.
+    callsign = st.session_state.callsign_input.upper()
+    year = st.session_state.year_input
+    claim = st.session_state.get("prefetch")
+    if claim is not None and (claim.callsign, claim.year) == (callsign, year):
+        return
+    release_session_prefetch()
+
+    if not CALLSIGN_PATTERN.match(callsign):
+        return
+
+    user_id = fetch_user_id_honor_roll(callsign)
+    if user_id is not None and all(get_stored_profile_cached(user_id, year, role) for role in ("Activator", "Chaser")):
+        return
+
+    st.session_state.prefetch = PrefetchClaim(callsign, year, prefetch_user_data(callsign, user_id, year))
+
 # -----------------------------
 # Callsign input
 # -----------------------------
 if st.session_state.callsign is None:
-    st.title("Your 2025 SOTA Unwrapped 🎧🏔️")
+    st.title("Your SOTA Unwrapped 🎧🏔️")
     st.write("Enter your callsign to begin:")
 
-    callsign_input = st.text_input("Callsign", placeholder="e.g. G5JFJ")
+    callsign_input = st.text_input("Callsign", placeholder="e.g. G5JFJ", key="callsign_input", on_change=prefetch_callsign)
+    year_input = st.selectbox("Year", YEARS, key="year_input", on_change=prefetch_callsign)
     if st.button("Start Activator Unwrapped ▶") and callsign_input:
         st.session_state.callsign = callsign_input.upper()
         st.session_state.wrapped_type = "Activator"
+        st.session_state.year = year_input
         st.rerun()
     elif st.button("Start Chaser Unwrapped ▶") and callsign_input:
         st.session_state.callsign = callsign_input.upper()
         st.session_state.wrapped_type = "Chaser"
+        st.session_state.year = year_input
         st.rerun()
 
     st.stop()
 
 callsign = st.session_state.callsign
 wrapped_type = st.session_state.wrapped_type
+year = st.session_state.year
 
 # -----------------------------
 # Fetch user data
 # -----------------------------
-user_id = fetch_user_id(callsign)
-if user_id is None:
+# The deck is built once per (callsign, role); navigation reruns skip
+# straight to rendering the current slide
+deck_key = (callsign, wrapped_type, year)
+if st.session_state.get("deck_key") != deck_key:
+    # Honor-roll index first, sotl.as only for callsigns not on either roll.
+    # Precomputed summaries are served directly; live fetch only on a miss.
     user_id = fetch_user_id_honor_roll(callsign)
-if wrapped_type == "Activator":
-    activation_data = fetch_activations_cached(user_id)
-    s2s_data = fetch_s2s_data_cached(user_id)
-elif wrapped_type == "Chaser":
-    chaser_data = fetch_chaser_data_cached(user_id)
-
-# Precompute metrics
-if wrapped_type == "Activator":
-    total_activator_points = get_total_activator_points_cached(activation_data)
-    most_qsos_activation = get_most_qsos_cached(activation_data)
-    num_activations = count_activations(activation_data)
-    qso_total, average_qsos_per_activation = get_activator_qso_stats_cached(activation_data)
-    popular_month, season, activations_count = most_popular_month_with_season(activation_data)
-    percentile, bucket = get_percentile_bucket(total_activator_points)
-    total_vertical = get_total_elevation_cached(activation_data)
-    qsos_df, most_popular_band, most_popular_band_qsos = get_qsos_per_band_cached(activation_data)
-    qsos_df_mode, most_popular_mode, most_popular_mode_qsos = get_qsos_per_mode_cached(activation_data)
-    if s2s_data != []:
-        num_s2s_qsos = count_s2s_qsos(s2s_data)
-        total_s2s_points = get_total_s2s_points_cached(s2s_data)
-
-elif wrapped_type == "Chaser":
-    total_chaser_points = get_total_chaser_points_cached(chaser_data)
-    percentile, bucket = get_chaser_percentile_bucket(total_chaser_points)
-    qso_total = count_chaser_qsos(chaser_data)
-    qsos_df, most_popular_band, most_popular_band_qsos = get_qsos_per_band_chaser_cached(chaser_data)
-    qsos_df_mode, most_popular_mode, most_popular_mode_qsos = get_qsos_per_mode_chaser_cached(chaser_data)
-    unique_summits = count_unique_summits(chaser_data)
-
+    profile, user_data = None, None
+    if user_id is not None:
+        profile = get_stored_profile_cached(user_id, year, wrapped_type)
+
+    if profile is None:
+        # Both roles' logs are fetched together, concurrently. Failures raise,
+        # so they are never cached and the next rerun tries again.
+        try:
+            user_data = fetch_user_data_cached(callsign, user_id, year)
+        except httpx.HTTPError:
+            st.title(f"{callsign}'s {year} SOTA {wrapped_type} Unwrapped")
+            st.write("We couldn't reach the SOTA database just now. Please try again later.")
+            st.stop()
+        user_id = user_data["user_id"]
+
+        if (wrapped_type == "Activator" and not user_data["activations"]) or (wrapped_type == "Chaser" and is_empty_profile(user_data["chaser_profile"])):
+            st.title(f"{callsign}'s {year} SOTA {wrapped_type} Unwrapped")
+            st.write(f"We couldn't find any {year} {wrapped_type.lower()} log for {callsign}. Please try again later.")
+            st.stop()
+
+        # Precompute metrics in a single pass over the log
+        profile = get_profile_cached(
+            user_id, year, wrapped_type, profile_data_version(user_data, wrapped_type), user_data
+        )
+
+    st.session_state.deck = build_deck(callsign, wrapped_type, year, profile)
+    st.session_state.metric_sources = slide_metric_sources(
+        callsign, user_id, year, profile, user_data["activations"] if user_data else ()
+    )
+    st.session_state.metric_futures = {}
+    st.session_state.deck_key = deck_key
+    # The deck has what it needs; the other role's logs need not keep downloading
+    release_session_prefetch()
 
+slides = st.session_state.deck
 
-# -----------------------------
-# Slides content
-# -----------------------------
-if wrapped_type == "Activator" and s2s_data != []:
-    slides = [
-        {
-            "title": f"{callsign}'s 2025 SOTA Activator Unwrapped ✨",
-            "type": "metric",
-            "metric": "Total Points",
-            "value": total_activator_points,
-            "emoji": "🏆",
-            "color": "#1DB954",
-            "description": f"You did {num_activations} activations this year"
-        },
-        {
-            "title": "Highest QSO Activation 📡",
-            "type": "metric",
-            "metric": most_qsos_activation["Summit"],
-            "value": most_qsos_activation["QSOs"],
-            "emoji": "⚡",
-            "color": "#FF6F61",
-            "description": "QSOs made on this summit"
-        },
-        {
-            "title": "Total QSOs 📡",
-            "type": "metric",
-            "metric": "Total QSOs this year",
-            "value": qso_total,
-            "emoji": "🗣️",
-            "color": "#7B3FE4",
-            "description": f"Average {average_qsos_per_activation:.2f} QSOs per activation"
-        },
-        {
-            "title": "S2S facts 🏔️↔️🏔️",
-            "type": "metric",
-            "metric": "Total S2S QSOs this year",
-            "value": num_s2s_qsos,
-            "emoji": "🔺",
-            "color": "#C2410C",
-            "description": f"You made {total_s2s_points} S2S points"
-        },
-        {
-            "title": "Your Busiest Month 📆",
-            "type": "metric",
-            "metric": popular_month,
-            "value": f"{activations_count} activations",
-            "emoji": "🌞" if season=="Summer" else "❄️" if season=="Winter" else "🌄",
-            "color": "#FFA500",
-            "description": f"{season} vibes for your activations!"
-        },
-        {
-            "title": "QSOs per Band 📶",
-            "type": "band_chart",
-            "chart_data": qsos_df,
-            "description": "Here’s how your QSOs were distributed across bands:"
-        },
-        {
-            "title": "Percentile & Rank 🙌",
-            "type": "metric",
-            "metric": f"{bucket} percentile",
-            "value": f"{percentile:.1f}%",
-            "emoji": "🙌",
-            "color": "#FFD700",
-            "description": "Compared to all activators"
-        },
-        {
-            "title": "Cumulative height of summits activated 🏔️",
-            "type": "metric",
-            "metric": "Cumulative summit height",
-            "value": total_vertical,
-            "emoji": "⛰️",
-            "color": "#00BFFF",
-            "description": "Reach for the stars"
-        },
-        {
-            "title": "Your Favourite Band 🥁",
-            "type": "metric",
-            "metric": f"it accounted for {most_popular_band_qsos} QSOs",
-            "value": f"{most_popular_band}",
-            "emoji": "🤘",
-            "color": "#00A8A8",
-            "description": "Yeah, not that type of band..."
-        },
-        {
-            "title": "QSOs per Mode 📶",
-            "type": "mode_chart",
-            "chart_data": qsos_df_mode,
-            "description": "Here’s how your QSOs were distributed across modes:"
-        },
-        {
-        "title": "Your SOTA Activator Unwrapped",
-        "type": "share"
-        },
-    ]
-elif wrapped_type == "Activator":
-    slides = [
-        {
-            "title": f"{callsign}'s 2025 SOTA Activator Unwrapped ✨",
-            "type": "metric",
-            "metric": "Total Points",
-            "value": total_activator_points,
-            "emoji": "🏆",
-            "color": "#1DB954",
-            "description": f"You did {num_activations} activations this year"
-        },
-        {
-            "title": "Highest QSO Activation 📡",
-            "type": "metric",
-            "metric": most_qsos_activation["Summit"],
-            "value": most_qsos_activation["QSOs"],
-            "emoji": "⚡",
-            "color": "#FF6F61",
-            "description": "QSOs made on this summit"
-        },
-        {
-            "title": "Total QSOs 📡",
-            "type": "metric",
-            "metric": "Total QSOs this year",
-            "value": qso_total,
-            "emoji": "🗣️",
-            "color": "#7B3FE4",
-            "description": f"Average {average_qsos_per_activation:.2f} QSOs per activation"
-        },
-        {
-            "title": "Your Busiest Month 📆",
-            "type": "metric",
-            "metric": popular_month,
-            "value": f"{activations_count} activations",
-            "emoji": "🌞" if season=="Summer" else "❄️" if season=="Winter" else "🌄",
-            "color": "#FFA500",
-            "description": f"{season} vibes for your activations!"
-        },
-        {
-            "title": "QSOs per Band 📶",
-            "type": "band_chart",
-            "chart_data": qsos_df,
-            "description": "Here’s how your QSOs were distributed across bands:"
-        },
-        {
-            "title": "Percentile & Rank 🙌",
-            "type": "metric",
-            "metric": f"{bucket} percentile",
-            "value": f"{percentile:.1f}%",
-            "emoji": "🙌",
-            "color": "#FFD700",
-            "description": "Compared to all activators"
-        },
-        {
-            "title": "Cumulative height of summits activated 🏔️",
-            "type": "metric",
-            "metric": "Cumulative summit height",
-            "value": total_vertical,
-            "emoji": "⛰️",
-            "color": "#00BFFF",
-            "description": "Reach for the stars"
-        },
-        {
-            "title": "Your Favourite Band 🥁",
-            "type": "metric",
-            "metric": f"it accounted for {most_popular_band_qsos} QSOs",
-            "value": f"{most_popular_band}",
-            "emoji": "🤘",
-            "color": "#00A8A8",
-            "description": "Yeah, not that type of band..."
-        },
-        {
-            "title": "QSOs per Mode 📶",
-            "type": "mode_chart",
-            "chart_data": qsos_df_mode,
-            "description": "Here’s how your QSOs were distributed across modes:"
-        },
-        {
-        "title": "Your SOTA Activator Unwrapped",
-        "type": "share"
-        },
-    ]
-elif wrapped_type == "Chaser":
-    slides = [
-        {
-            "title": f"{callsign}'s 2025 SOTA Chaser Unwrapped ✨",
-            "type": "metric",
-            "metric": "Total Points",
-            "value": total_chaser_points,
-            "emoji": "🏆",
-            "color": "#1DB954",
-            "description": f"That's a lot of happy Activators!"
-        },
-        {
-            "title": "Total QSOs 📡",
-            "type": "metric",
-            "metric": "Total QSOs this year",
-            "value": qso_total,
-            "emoji": "🗣️",
-            "color": "#7B3FE4",
-            "description": f"You worked {unique_summits} unique summits"
-        },
-        {
-            "title": "Percentile & Rank 🙌",
-            "type": "metric",
-            "metric": f"{bucket} percentile",
-            "value": f"{percentile:.1f}%",
-            "emoji": "🙌",
-            "color": "#FFD700",
-            "description": "Compared to all chasers"
-        },
-        {
-            "title": "QSOs per Band 📶",
-            "type": "band_chart",
-            "chart_data": qsos_df,
-            "description": "Here’s how your QSOs were distributed across bands:"
-        },
-        {
-            "title": "Your Favourite Band 🥁",
-            "type": "metric",
-            "metric": f"it accounted for {most_popular_band_qsos} QSOs",
-            "value": f"{most_popular_band}",
-            "emoji": "🤘",
-            "color": "#00A8A8",
-            "description": "Yeah, not that type of band..."
-        },
-        {
-            "title": "QSOs per Mode 📶",
-            "type": "mode_chart",
-            "chart_data": qsos_df_mode,
-            "description": "Here’s how your QSOs were distributed across modes:"
-        },
-        {
-        "title": "Your SOTA Chaser Unwrapped",
-        "type": "chaser_share"
-        }
-    ]
 # -----------------------------
 # Display current slide
 # -----------------------------
-slide = slides[st.session_state.slide]
-st.markdown(f"### {slide['title']}")
-
-if slide["type"] == "band_chart":
-    st.write(slide["description"])
-    placeholder = st.empty()
-    chart_data = slide["chart_data"].copy()
-    steps = 50
-    x_max = chart_data["QSOs"].max()
-    chart_data["QSOsAnimated"] = 0
-
-    for i in range(1, steps + 1):
-        chart_data["QSOsAnimated"] = (chart_data["QSOs"] * i / steps).astype(int)
-        chart = alt.Chart(chart_data).mark_bar(color="#FF6F61").encode(
-            x=alt.X("QSOsAnimated:Q", title="Number of QSOs", scale=alt.Scale(domain=[0, x_max])),
-            y=alt.Y("Band:N", sort="-x", title="Band")
-        ).properties(height=400)
-        placeholder.altair_chart(chart, width='stretch')
-        time.sleep(0.02)
-
-if slide["type"] == "mode_chart":
-    st.write(slide["description"])
-    placeholder = st.empty()
-    chart_data = slide["chart_data"].copy()
-    steps = 50
-    x_max = chart_data["QSOs"].max()
-    chart_data["QSOsAnimated"] = 0
-
-    for i in range(1, steps + 1):
-        chart_data["QSOsAnimated"] = (chart_data["QSOs"] * i / steps).astype(int)
-        chart = alt.Chart(chart_data).mark_bar(color="#14B8A6").encode(
-            x=alt.X("QSOsAnimated:Q", title="Number of QSOs", scale=alt.Scale(domain=[0, x_max])),
-            y=alt.Y("Mode:N", sort="-x", title="Mode")
-        ).properties(height=400)
-        placeholder.altair_chart(chart, width='stretch')
-        time.sleep(0.02)
-
-elif slide["type"] == "metric":
-    with st.container():
-
-        # Animate Vertical Gain / Total Activations
-        if slide["metric"] in ["Cumulative summit height", "Total Points"]:
-            placeholder = st.empty()
-            steps = 40
-            for i in range(steps + 1):
-                display_value = int(i * slide["value"] / steps)
-                if slide["metric"] == "Cumulative summit height":
-                    display_value = f"{display_value:,}m"
-                else:
-                    display_value = f"{display_value:,}"
-                placeholder.markdown(
-                    f"""
-                    <div class="fade-in-card" style="
-                    display: flex;
-                    flex-direction: column;
-                    justify-content: center;
-                    align-items: center;
-                    font-family: 'Inter', Arial, Helvetica, sans-serif;
-                    background-color:{slide['color']};
-                    padding: 20px 30px;
-                    border-radius: 20px;
-                    text-align: center;
-                    color: white;
-                    width: 100%;
-                    max-width: 600px;
-                    margin: auto;
-                ">
-                    <h1 style="font-size:60px; margin:0;">
-                        {slide['emoji']} {display_value}
-                    </h1>
-                    <p style="font-size:24px; margin:4px 0 0 0;">
-                        {slide['metric']}
-                    </p>
-                    <p style="font-size:18px; margin-top:10px;">
-                        {slide['description']}
-                    </p>
-                </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                time.sleep(0.03)
-        else:
-            # Fade-in card
-            components.html(f"""
-            <div class="fade-in-card" style="
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                align-items: center;
-                font-family: 'Inter', Arial, Helvetica, sans-serif;
-                background-color:{slide['color']};
-                padding: 20px 30px;
-                border-radius: 20px;
-                text-align: center;
-                color: white;
-                width: 100%;
-                max-width: 600px;
-                margin: auto;
-            ">
-                <h1 style="font-size:60px; margin:0;">
-                    {slide['emoji']} {slide['value']}
-                </h1>
-                <p style="font-size:24px; margin:4px 0 0 0;">
-                    {slide['metric']}
-                </p>
-                <p style="font-size:18px; margin-top:10px;">
-                    {slide['description']}
-                </p>
-            </div>
-
-            <style>
-            @keyframes fadeInUp {{
-            from {{
-                opacity: 0;
-                transform: translateY(20px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-            }}
-
-            .fade-in-card {{
-                animation: fadeInUp 0.8s ease-out;
-            }}
-            </style>
-            """, height=250)
-
-elif slide["type"] == "share":
-
-    components.html(
-        f"""
-        <div style="
-            max-width: 420px;
-            margin: 40px auto;
-            background: linear-gradient(135deg, #1e3c72, #2a5298);
-            padding: 28px;
-            border-radius: 24px;
-            color: white;
-            text-align: center;
-            font-family: system-ui, -apple-system, BlinkMacSystemFont;
-        ">
-
-            <img src="data:image/png;base64,{b64_logo}"
-                style="width:90px; margin-bottom:14px;" />
-
-            <h2 style="margin: 6px 0 20px 0;">
-                {callsign}
-            </h2>
-
-            <div style="
-                display:grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 16px;
-                margin-bottom: 20px;
-            ">
-
-                <div>
-                    <h3>📶 Favourite Band</h3>
-                    <p>{most_popular_band}</p>
-                </div>
-
-                <div>
-                    <h3>📡 Total QSOs</h3>
-                    <p>{qso_total}</p>
-                </div>
-
-                <div>
-                    <h3>🏆 Total Points</h3>
-                    <p>{total_activator_points}</p>
-                </div>
-
-                <div>
-                    <h3>🏔️ Total Activations</h3>
-                    <p>{num_activations}</p>
-                </div>
-
-            </div>
-
-            <p style="opacity:0.85; font-size:14px;">
-                SOTA Activator Unwrapped 2025
-            </p>
-
-        </div>
-        """,
-        height=560
-    )
-
-elif slide["type"] == "chaser_share":
-
-    components.html(
-        f"""
-        <div style="
-            max-width: 420px;
-            margin: 40px auto;
-            background: linear-gradient(135deg, #7b2c2c, #c06c30);
-            padding: 28px;
-            border-radius: 24px;
-            color: white;
-            text-align: center;
-            font-family: system-ui, -apple-system, BlinkMacSystemFont;
-        ">
-
-            <img src="data:image/png;base64,{b64_logo}"
-                style="width:90px; margin-bottom:14px;" />
-
-            <h2 style="margin: 6px 0 20px 0;">
-                {callsign}
-            </h2>
-
-            <div style="
-                display:grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 16px;
-                margin-bottom: 20px;
-            ">
-
-                <div>
-                    <h3>📶 Favourite Band</h3>
-                    <p>{most_popular_band}</p>
-                </div>
-
-                <div>
-                    <h3>📡 Total QSOs</h3>
-                    <p>{qso_total}</p>
-                </div>
-
-                <div>
-                    <h3>🏆 Total Points</h3>
-                    <p>{total_chaser_points}</p>
-                </div>
-
-                <div>
-                    <h3>🛰️ Favourite Mode</h3>
-                    <p>{most_popular_mode}</p>
-                </div>
-
-            </div>
-
-            <p style="opacity:0.85; font-size:14px;">
-                SOTA Chaser Unwrapped 2025
-            </p>
-
-        </div>
-        """,
-        height=560
-    )
+# Start on the next slide's metric while this one is being shown
+if st.session_state.slide < len(slides) - 1 and "needs" in slides[st.session_state.slide + 1]:
+    prefetch_metric(slides[st.session_state.slide + 1]["needs"])
+
+# Timed per slide type, including any wait on the slide's lazy metric
+with span("render", slides[st.session_state.slide]["type"]):
+    slide = resolve_slide(slides[st.session_state.slide])
+    st.markdown(f"### {slide['title']}")
+
+    if slide["type"] == "band_chart":
+        st.write(slide["description"])
+        animated_bar_chart(slide["chart_data"], "Band", "#FF6F61")
+
+    elif slide["type"] == "mode_chart":
+        st.write(slide["description"])
+        animated_bar_chart(slide["chart_data"], "Mode", "#14B8A6")
+
+    elif slide["type"] == "metric":
+        with st.container():
+
+            # Count up Vertical Gain / Total Points in the browser
+            if slide["metric"] in ["Cumulative summit height", "Total Points"]:
+                suffix = "m" if slide["metric"] == "Cumulative summit height" else ""
+                count_up_card(slide, suffix)
+            else:
+                metric_card(slide)
+
+    elif slide["type"] == "year_over_year":
+        st.write(slide["description"])
+        year_over_year(slide["history"])
+
+    elif slide["type"] == "share":
+        share_card(callsign, slide["role"], slide["year"], slide["metrics"])
 
 
 # -----------------------------
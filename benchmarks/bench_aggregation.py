@@ -0,0 +1,101 @@
+import sys
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_data import synthetic_activator_log, synthetic_chaser_log, synthetic_summit_codes
+from services.data import (
+    ACTIVATOR_BAND_KEYS,
+    ACTIVATOR_MODE_KEYS,
+    CHASER_BAND_ORDER,
+    CHASER_MODE_ORDER,
+    build_activator_profile,
+    build_chaser_profile,
+    freeze_log,
+    get_qsos_per_band,
+    get_qsos_per_band_chaser,
+    get_qsos_per_mode,
+    get_qsos_per_mode_chaser,
+    load_log_frame
+)
+
+# Compares the vectorized band/mode aggregation against the old per-QSO dict
+# loops on synthetic chaser logs, then times the profile builds the app
+# actually runs: chunked frames for chaser logs, a per-row loop for the
+# (at most ~1000-row) activator logs, next to the frame path it would replace.
+SIZES = [1_000, 10_000, 100_000]
+ACTIVATOR_SIZES = [10, 100, 1_000]
+REPEAT = 5
+
+def legacy_counts(chaser_data, column, order):
+    totals = {name: 0 for name in order}
+
+    for qso in chaser_data:
+        value = qso.get(column)
+        if value in totals:
+            totals[value] += 1
+
+    df = pd.DataFrame({column: list(totals.keys()), "QSOs": list(totals.values())})
+    df = df[df["QSOs"] > 0].reset_index(drop=True)
+    df[column] = pd.Categorical(df[column], categories=order, ordered=True)
+    df = df.sort_values(column).reset_index(drop=True)
+
+    if df.empty:
+        return df, None, 0
+
+    top = df.loc[df["QSOs"].idxmax()]
+    return df, top[column], int(top["QSOs"])
+
+def best_of(func):
+    return min(timeit.repeat(func, number=1, repeat=REPEAT))
+
+def main():
+    print(f"{'QSOs':>8} {'legacy':>10} {'vectorized':>11} {'shared frame':>13}")
+
+    summit_codes = synthetic_summit_codes(3_000)
+    for size in SIZES:
+        log = synthetic_chaser_log(size, summit_codes)
+
+        # Same tuples as the old loops
+        for column, order, func in (("Band", CHASER_BAND_ORDER, get_qsos_per_band_chaser),
+                                    ("Mode", CHASER_MODE_ORDER, get_qsos_per_mode_chaser)):
+            expected = legacy_counts(log, column, order)
+            actual = func(log)
+            pd.testing.assert_frame_equal(expected[0], actual[0])
+            assert expected[1:] == actual[1:]
+
+        legacy = best_of(lambda: (legacy_counts(log, "Band", CHASER_BAND_ORDER),
+                                  legacy_counts(log, "Mode", CHASER_MODE_ORDER)))
+        vectorized = best_of(lambda: (get_qsos_per_band_chaser(log),
+                                      get_qsos_per_mode_chaser(log)))
+
+        def shared_frame():
+            frame = load_log_frame(log, ["Band", "Mode"])
+            return get_qsos_per_band_chaser(frame), get_qsos_per_mode_chaser(frame)
+
+        shared = best_of(shared_frame)
+
+        print(f"{size:>8} {legacy * 1000:>8.2f}ms {vectorized * 1000:>9.2f}ms {shared * 1000:>11.2f}ms")
+
+    print(f"\n{'QSOs':>8} {'chaser profile':>15}")
+    for size in SIZES:
+        # Frozen, as the app's cached logs are
+        log = freeze_log(synthetic_chaser_log(size, summit_codes))
+        print(f"{size:>8} {best_of(lambda: build_chaser_profile(log, deferred=True)) * 1000:>13.2f}ms")
+
+    print(f"\n{'activations':>11} {'profile (loop)':>15} {'bands+modes (frame)':>20}")
+    for size in ACTIVATOR_SIZES:
+        log = freeze_log(synthetic_activator_log(size, summit_codes))
+        profile = best_of(lambda: build_activator_profile(log, deferred=True))
+
+        def frame_totals():
+            frame = load_log_frame(log, [*ACTIVATOR_BAND_KEYS, *ACTIVATOR_MODE_KEYS])
+            return get_qsos_per_band(frame), get_qsos_per_mode(frame)
+
+        print(f"{size:>11} {profile * 1000:>13.2f}ms {best_of(frame_totals) * 1000:>18.2f}ms")
+
+if __name__ == "__main__":
+    main()
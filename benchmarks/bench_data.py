@@ -0,0 +1,325 @@
+import argparse
+import csv
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Spans would only add noise (and files) to the measurements
+os.environ.setdefault("SOTA_TELEMETRY", "0")
+
+from services import data
+from services.data import (
+    ACTIVATOR_BAND_KEYS,
+    ACTIVATOR_MODE_KEYS,
+    CHASER_BAND_ORDER,
+    CHASER_MODE_ORDER,
+    CURRENT_YEAR
+)
+
+# Times and peak memory for every public function in services/data.py on
+# synthetic data at production scale. Runs in a scratch directory, so the
+# relative data/ paths in services/data.py point at the synthetic files.
+ACTIVATOR_SIZES = (10, 100, 1_000)
+CHASER_SIZES = (1_000, 10_000, 100_000)
+ROLL_SIZES = (5_000, 50_000)
+SUMMIT_ROWS = 180_000
+REPEAT = 5
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "bench_data.json"
+
+ASSOCIATIONS = ("G", "GW", "GM", "DL", "DM", "F", "HB", "I", "OE", "SP", "OK", "EA1", "W7A", "W6", "VK2", "ZL1")
+
+# -----------------------------
+# Synthetic data
+# -----------------------------
+def synthetic_summit_codes(rows=SUMMIT_ROWS):
+    per_association = -(-rows // len(ASSOCIATIONS))
+    codes = [
+        f"{association}/{chr(65 + n // 1000 % 26)}{chr(65 + n // 26000 % 26)}-{n % 1000:03d}"
+        for association in ASSOCIATIONS
+        for n in range(per_association)
+    ]
+    return codes[:rows]
+
+def write_summits_csv(path, codes, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        # Same shape as the published list: a title line above the header
+        f.write("SOTA Summits List (Date=01/01/2025)\n")
+        writer = csv.writer(f)
+        writer.writerow(["SummitCode", "AssociationName", "RegionName", "SummitName", "AltM", "AltFt", "Points"])
+        for code in codes:
+            altitude = rng.randint(100, 4800)
+            writer.writerow([code, "Association", "Region", f"Summit {code}", altitude, round(altitude * 3.281), rng.randint(1, 10)])
+
+def synthetic_activator_log(size, summit_codes, seed=0):
+    rng = random.Random(seed)
+    log = []
+    total = 0
+
+    for i in range(size):
+        qsos = rng.randint(4, 60)
+        points = rng.randint(1, 10)
+        total += points
+        activation = {
+            "ActivationDate": f"{CURRENT_YEAR}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "SummitCode": rng.choice(summit_codes),
+            "Summit": f"Summit {i}",
+            "Total": total,
+            "QSOs": qsos
+        }
+        for key in ACTIVATOR_BAND_KEYS:
+            activation[key] = 0
+        for key in ACTIVATOR_MODE_KEYS:
+            activation[key] = 0
+        for _ in range(qsos):
+            activation[rng.choice(list(ACTIVATOR_BAND_KEYS))] += 1
+            activation[rng.choice(list(ACTIVATOR_MODE_KEYS))] += 1
+        log.append(activation)
+
+    return log
+
+def synthetic_s2s_log(size, seed=0):
+    rng = random.Random(seed)
+    total = 0
+    log = []
+    for _ in range(size):
+        total += rng.randint(1, 10)
+        log.append({"Total": total})
+    return log
+
+def synthetic_chaser_log(size, summit_codes, seed=0):
+    rng = random.Random(seed)
+    total = 0
+    log = []
+    for _ in range(size):
+        total += rng.randint(1, 10)
+        log.append({
+            "Band": rng.choice(CHASER_BAND_ORDER[1:16]),
+            "Mode": rng.choice(CHASER_MODE_ORDER),
+            "SummitCode": rng.choice(summit_codes),
+            "Total": total
+        })
+    return log
+
+def synthetic_honor_roll(size, chaser=False, seed=0):
+    rng = random.Random(seed)
+    roll = []
+    for position in range(size):
+        points = rng.randint(1, 60_000)
+        entry = {
+            "Average": f"{rng.uniform(1, 10):.2f}",
+            "Callsign": f"{rng.choice(ASSOCIATIONS)}{position}ABC",
+            "Points": points,
+            "Position": str(position + 1),
+            "UserID": 10_000 + position
+        }
+        if chaser:
+            entry["stationsWorked"] = rng.randint(1, 20_000)
+        else:
+            entry["BonusPoints"] = rng.randint(0, 500)
+            entry["Summits"] = rng.randint(1, 400)
+            entry["totalPoints"] = points + entry["BonusPoints"]
+        roll.append(entry)
+    return roll
+
+# -----------------------------
+# Harness
+# -----------------------------
+def reset_resident():
+    data._resident.clear()
+
+def remove(*paths):
+    for path in paths:
+        Path(path).unlink(missing_ok=True)
+
+def install_rolls(rolls, size):
+    # The honor-roll JSON of one size, with no tables or resident copies yet
+    for role in ("Activator", "Chaser"):
+        json_path, table_path = data.honor_roll_files(role)
+        remove(table_path)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(rolls[role, size], f)
+    reset_resident()
+
+def measure(call, setup, repeat):
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+
+    # A separate traced run: tracemalloc slows the call down
+    setup()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return timings, peak
+
+def build_cases(summit_codes, rolls):
+    # (function, variant, size, setup, call); setup runs untimed before every call
+    cases = []
+    activator_logs = {size: synthetic_activator_log(size, summit_codes) for size in ACTIVATOR_SIZES}
+    s2s_logs = {size: synthetic_s2s_log(size) for size in ACTIVATOR_SIZES}
+    chaser_logs = {size: synthetic_chaser_log(size, summit_codes) for size in CHASER_SIZES}
+    nothing = lambda: None
+
+    def add(function, variant, size, call, setup=nothing):
+        cases.append((function, variant, size, setup, call))
+
+    # Summit index: cold from the CSV, from the binary index, and resident
+    cold_index = lambda: (remove(data.SUMMIT_INDEX_FILE), reset_resident())
+    add("build_summit_index", "csv", SUMMIT_ROWS, data.build_summit_index, cold_index)
+    add("load_summit_index", "cold-csv", SUMMIT_ROWS, data.load_summit_index, cold_index)
+    add("load_summit_index", "cold-idx", SUMMIT_ROWS, data.load_summit_index,
+        lambda: (data.load_summit_index(), reset_resident()))
+    add("load_summit_index", "warm", SUMMIT_ROWS, data.load_summit_index, data.load_summit_index)
+    add("fetch_summit_elevation", "warm", SUMMIT_ROWS, lambda: data.fetch_summit_elevation(summit_codes[1234]),
+        data.load_summit_index)
+
+    for size, log in activator_logs.items():
+        s2s = s2s_logs[size]
+        add("get_points_total", "activator", size, lambda log=log: data.get_points_total(log))
+        add("get_most_qsos_activation", "", size, lambda log=log: data.get_most_qsos_activation(log))
+        add("count_activations", "", size, lambda log=log: data.count_activations(log))
+        add("count_s2s_qsos", "", size, lambda s2s=s2s: data.count_s2s_qsos(s2s))
+        add("most_popular_month_with_season", "", size, lambda log=log: data.most_popular_month_with_season(log))
+        add("get_qsos_per_band", "", size, lambda log=log: data.get_qsos_per_band(log))
+        add("get_qsos_per_mode", "", size, lambda log=log: data.get_qsos_per_mode(log))
+        add("get_activator_qso_stats", "", size, lambda log=log: data.get_activator_qso_stats(log))
+        add("get_total_elevation_gain", "cold", size, lambda log=log: data.get_total_elevation_gain(log), reset_resident)
+        add("get_total_elevation_gain", "warm", size, lambda log=log: data.get_total_elevation_gain(log),
+            data.load_summit_index)
+        add("build_activator_profile", "deferred", size,
+            lambda log=log, s2s=s2s: data.build_activator_profile(log, s2s, deferred=True))
+        add("build_activator_profile", "warm", size,
+            lambda log=log, s2s=s2s: data.build_activator_profile(log, s2s), data.load_summit_index)
+        add("build_profile", "activator", size,
+            lambda log=log, s2s=s2s: data.build_profile("Activator", log, s2s, deferred=True))
+
+    for size, log in chaser_logs.items():
+        add("freeze_log", "chaser", size, lambda log=log: data.freeze_log(log))
+        add("get_points_total", "chaser", size, lambda log=log: data.get_points_total(log))
+        add("count_chaser_qsos", "", size, lambda log=log: data.count_chaser_qsos(log))
+        add("load_log_frame", "", size, lambda log=log: data.load_log_frame(log, ["Band", "Mode"]))
+        add("get_qsos_per_band_chaser", "", size, lambda log=log: data.get_qsos_per_band_chaser(log))
+        add("get_qsos_per_mode_chaser", "", size, lambda log=log: data.get_qsos_per_mode_chaser(log))
+        add("count_unique_summits", "", size, lambda log=log: data.count_unique_summits(log))
+        add("build_chaser_profile", "deferred", size, lambda log=log: data.build_chaser_profile(log, deferred=True))
+        add("build_profile", "chaser", size, lambda log=log: data.build_profile("Chaser", chaser_data=log, deferred=True))
+
+    for size in ROLL_SIZES:
+        activator_json, activator_table = data.honor_roll_files("Activator")
+        chaser_json, chaser_table = data.honor_roll_files("Chaser")
+        roll = rolls["Activator", size]
+        install = lambda size=size: install_rolls(rolls, size)
+        warm = lambda size=size: (install_rolls(rolls, size), data.get_percentile_bucket(1000),
+                                  data.get_chaser_percentile_bucket(1000), data.fetch_user_id_honor_roll("G0ABC"))
+        from_table = lambda warm=warm: (warm(), reset_resident())
+
+        add("write_honor_roll_table", "", size,
+            lambda roll=roll: data.write_honor_roll_table(roll, activator_table, activator_json), install)
+        add("load_honor_roll_table", "rebuild", size,
+            lambda: data.load_honor_roll_table(activator_table, activator_json), install)
+        add("load_honor_roll_table", "mapped", size,
+            lambda: data.load_honor_roll_table(activator_table, activator_json), from_table)
+        for function in (data.get_percentile_bucket, data.get_chaser_percentile_bucket):
+            add(function.__name__, "cold", size, lambda function=function: function(1000), install)
+            add(function.__name__, "mapped", size, lambda function=function: function(1000), from_table)
+            add(function.__name__, "warm", size, lambda function=function: function(1000), warm)
+        add("get_role_percentile_bucket", "warm", size, lambda: data.get_role_percentile_bucket("Chaser", 1000), warm)
+        add("fetch_user_id_honor_roll", "cold", size, lambda: data.fetch_user_id_honor_roll("G0ABC"), install)
+        add("fetch_user_id_honor_roll", "warm", size, lambda: data.fetch_user_id_honor_roll("G0ABC"), warm)
+
+    profile = data.build_chaser_profile(chaser_logs[CHASER_SIZES[0]], deferred=True)
+    add("is_empty_profile", "", 1, lambda: data.is_empty_profile(profile))
+    add("honor_roll_files", "", 1, lambda: data.honor_roll_files("Chaser", CURRENT_YEAR - 1))
+
+    return cases
+
+def public_functions():
+    return sorted(
+        name for name, value in vars(data).items()
+        if inspect.isfunction(value) and value.__module__ == data.__name__ and not name.startswith("_")
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every public function in services/data.py")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per case")
+    parser.add_argument("--filter", default="", help="only run functions whose name contains this")
+    args = parser.parse_args()
+    args.output = args.output.resolve()
+
+    with tempfile.TemporaryDirectory(prefix="sota-bench-") as scratch:
+        os.chdir(scratch)
+        Path("data").mkdir()
+
+        print(f"Generating {SUMMIT_ROWS:,} summits and honor rolls of {', '.join(f'{n:,}' for n in ROLL_SIZES)}...")
+        summit_codes = synthetic_summit_codes()
+        write_summits_csv(data.SUMMITSLIST_CSV, summit_codes)
+        rolls = {
+            (role, size): synthetic_honor_roll(size, chaser=role == "Chaser", seed=size)
+            for role in ("Activator", "Chaser")
+            for size in ROLL_SIZES
+        }
+        cases = build_cases(summit_codes, rolls)
+
+        # Every public function needs a case, so new ones can't slip past
+        missing = sorted(set(public_functions()) - {case[0] for case in cases})
+        if missing:
+            sys.exit(f"No benchmark case for: {', '.join(missing)}")
+
+        results = []
+        print(f"{'function':<32} {'variant':<10} {'size':>8} {'median':>11} {'min':>11} {'peak mem':>10}")
+        for function, variant, size, setup, call in cases:
+            if args.filter not in function:
+                continue
+
+            timings, peak = measure(call, setup, args.repeat)
+            result = {
+                "function": function,
+                "variant": variant,
+                "size": size,
+                "repeat": args.repeat,
+                "median_s": statistics.median(timings),
+                "min_s": min(timings),
+                "max_s": max(timings),
+                "peak_bytes": peak
+            }
+            results.append(result)
+            print(f"{function:<32} {variant:<10} {size:>8} {result['median_s'] * 1000:>9.3f}ms "
+                  f"{result['min_s'] * 1000:>9.3f}ms {peak / 1024:>8.0f}KB")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "results": results
+        }, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.request import urlopen
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(ROOT))
+
+# Spans and cache counters are part of the report. Set before anything
+# imports services (bench_data, via replay_server, would switch them off).
+os.environ.setdefault("SOTA_TELEMETRY", "1")
+os.environ.setdefault("SOTA_TELEMETRY_LOG", str(RESULTS_DIR / "loadtest.telemetry.{worker}.log"))
+
+# Drives app.py end to end with many concurrent AppTest sessions against
+# benchmarks/replay_server.py, fully offline. Each session enters a
+# callsign, picks the year, starts a role and clicks through every slide;
+# every rerun is timed and reported per step, along with throughput and
+# upstream traffic. AppTest is not safe to run from several threads of one
+# process, so sessions run in worker processes, one at a time in each, and
+# every worker keeps its own Streamlit caches and telemetry files.
+DEFAULT_SESSIONS = 200
+DEFAULT_CONCURRENCY = 8
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+def summarize(timings):
+    return {
+        "count": len(timings),
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "max_ms": max(timings) * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000
+    }
+
+def pick_callsigns(sessions, users, skew, seed):
+    # Zipf-like: a few callsigns get most of the traffic, as when one is shared
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    return rng.choices(range(users), weights=weights, k=sessions)
+
+def start_worker():
+    # Runs in each worker process; its id keys the worker's telemetry files
+    os.environ["SOTA_WORKER_ID"] = f"loadtest-{os.getpid()}"
+
+def page_name(at, callsign):
+    # The slide's title or, for the pages shown instead of a deck (no log,
+    # upstream down), their message; callsign taken out so sessions line up
+    title = next((m.value[4:] for m in at.markdown if m.value.startswith("### ")), None)
+    if title is None:
+        title = f"page: {at.markdown[0].value}" if at.markdown else "page: (empty)"
+    else:
+        title = f"slide: {title}"
+    return title.replace(callsign, "{callsign}")
+
+def run_session(number, callsign, role, year, timeout):
+    # Returns (steps, error): a failed session still reports the steps it got through
+    from streamlit.testing.v1 import AppTest
+    from services import telemetry
+
+    steps = []
+
+    def timed_run(step, action):
+        start = time.perf_counter()
+        action()
+        steps.append((step, time.perf_counter() - start))
+        if at.exception:
+            raise RuntimeError(f"{step}: {at.exception[0].message}")
+
+    try:
+        at = AppTest.from_file(str(APP), default_timeout=timeout)
+        timed_run("landing", at.run)
+        timed_run("year", lambda: at.selectbox(key="year_input").select(year).run())
+        timed_run("callsign", lambda: at.text_input(key="callsign_input").input(callsign).run())
+        start = next(button for button in at.button if button.label.startswith(f"Start {role}"))
+        timed_run("start", lambda: start.click().run())
+
+        for _ in range(50):
+            steps[-1] = (page_name(at, callsign), steps[-1][1])
+
+            next_button = [button for button in at.button if button.label.startswith("Next")]
+            if not next_button:
+                break
+            timed_run("next", lambda: next_button[0].click().run())
+    except Exception as e:
+        return steps, str(e) or traceback.format_exc(limit=3)
+    finally:
+        # Cumulative for this worker, rewritten after each of its sessions
+        if telemetry.WORKER is not None:
+            telemetry.export_metrics(RESULTS_DIR / f"loadtest.{telemetry.WORKER}.prom")
+
+    return steps, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of app.py against the replay server")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of callsign popularity")
+    parser.add_argument("--chaser-share", type=float, default=0.3, help="fraction of sessions that pick Chaser")
+    parser.add_argument("--summaries", action="store_true", help="precompute summaries first, as in production")
+    parser.add_argument("--server", help="use an already running replay server at this base URL")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun AppTest timeout, seconds")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "loadtest.json")
+    parser.add_argument("--year", type=int, help="year every session picks (default: the current year)")
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from bench_data import write_summits_csv
+    from replay_server import ReplayData, add_server_arguments, base_url, callsign_for, serve_in_thread, server_options
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    args.output = args.output.resolve()
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+
+    server = None
+    url = args.server
+    if url is None:
+        server = serve_in_thread(**server_options(args))
+        url = base_url(server)
+    summit_codes = (server.data if server else ReplayData(args.users, args.seed)).summit_codes
+
+    # Everything the app writes (stores, tables, share cards) goes to a scratch
+    # directory; the URLs have to be set before services.api is imported
+    scratch = tempfile.TemporaryDirectory(prefix="sota-loadtest-")
+    os.chdir(scratch.name)
+    Path("data").mkdir()
+    shutil.copy(ROOT / "data" / "logo.png", "data/logo.png")
+    # The summit list the replayed logs were drawn from
+    write_summits_csv("data/summitslist.csv", summit_codes)
+    os.environ["SOTA_SOTL_URL"] = url
+    os.environ["SOTA_API_URL"] = url
+
+    import update_honor_roll
+    from services.api import run_async
+    from services.data import CURRENT_YEAR
+
+    year = args.year or CURRENT_YEAR
+    print(f"Replay server {url}; fetching {year} honor rolls...")
+    honor_roll, chaser_honor_roll = run_async(update_honor_roll.refresh_honor_rolls(year))
+    if args.summaries:
+        update_honor_roll.precompute_summaries(honor_roll, chaser_honor_roll, year)
+
+    users = len(honor_roll) or args.users
+    rng = random.Random(args.seed)
+    plan = [
+        (number, callsign_for(index), "Chaser" if rng.random() < args.chaser_share else "Activator")
+        for number, index in enumerate(pick_callsigns(args.sessions, users, args.skew, args.seed))
+    ]
+
+    by_step = defaultdict(list)
+    errors = []
+
+    # Workers started fresh (not forked from this process's threads) append
+    # to this run's telemetry files only
+    for old in [*RESULTS_DIR.glob("loadtest.loadtest-*.prom"), *RESULTS_DIR.glob("loadtest.telemetry.*")]:
+        old.unlink()
+    # Workers look the functions up by module name: AppTest replaces a
+    # process's __main__ with app.py while it runs a script
+    import loadtest
+
+    print(f"Running {len(plan)} sessions in {args.concurrency} worker processes...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.concurrency, multiprocessing.get_context("spawn"), loadtest.start_worker) as pool:
+        futures = [
+            (number, callsign, role, pool.submit(loadtest.run_session, number, callsign, role, year, args.timeout))
+            for number, callsign, role in plan
+        ]
+        for number, callsign, role, future in futures:
+            steps, error = future.result()
+            if error is not None:
+                errors.append({"session": number, "callsign": callsign, "role": role, "error": error})
+                continue
+            for step, seconds in steps:
+                by_step[step].append(seconds)
+                by_step["all reruns"].append(seconds)
+    elapsed = time.perf_counter() - started
+
+    upstream = {}
+    try:
+        with urlopen(f"{url}/_stats", timeout=10) as response:
+            upstream = json.load(response)
+    except OSError:
+        pass
+
+    reruns = len(by_step["all reruns"])
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sessions": len(plan),
+        "concurrency": args.concurrency,
+        "year": year,
+        "summaries": args.summaries,
+        "server": {key: value for key, value in vars(args).items() if key in ("latency_ms", "jitter_ms", "error_rate", "stall_rate", "users", "seed")},
+        "elapsed_s": elapsed,
+        "sessions_per_s": (len(plan) - len(errors)) / elapsed,
+        "reruns_per_s": reruns / elapsed,
+        "errors": errors,
+        "upstream_requests": upstream,
+        "steps": {step: summarize(timings) for step, timings in sorted(by_step.items())}
+    }
+
+    print(f"{'step':<56} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for step, stats in report["steps"].items():
+        print(f"{step[:56]:<56} {stats['count']:>6} {stats['p50_ms']:>7.0f}ms {stats['p95_ms']:>7.0f}ms "
+              f"{stats['p99_ms']:>7.0f}ms {stats['max_ms']:>7.0f}ms")
+    print(f"{len(plan) - len(errors)}/{len(plan)} sessions in {elapsed:.1f}s "
+          f"({report['sessions_per_s']:.2f} sessions/s, {report['reruns_per_s']:.1f} reruns/s); "
+          f"upstream requests: {sum(v for k, v in upstream.items() if k not in ('not_modified', 'injected_errors'))}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if server is not None:
+        server.shutdown()
+    os.chdir(ROOT)
+    scratch.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from bench_data import (
+    synthetic_activator_log,
+    synthetic_chaser_log,
+    synthetic_s2s_log,
+    synthetic_summit_codes
+)
+
+# Local stand-in for sotl.as and api-db2.sota.org.uk, for offline load
+# tests: set SOTA_SOTL_URL and SOTA_API_URL to the printed base URL.
+# Responses are deterministic per user and year (or read from --fixtures),
+# carry ETags, and can be slowed down or failed on purpose.
+FIRST_USER_ID = 100_000
+DEFAULT_USERS = 500
+
+ROUTES = (
+    ("user_id", re.compile(r"^/api/activators/(?P<callsign>[^/]+)/?$")),
+    ("activator", re.compile(r"^/logs/activator/(?P<user_id>\d+)/(?P<year>\d+)/\d+/?$")),
+    ("chaser", re.compile(r"^/logs/chaser/(?P<user_id>\d+)/(?P<year>\d+)/\d+/?$")),
+    ("s2s", re.compile(r"^/logs/s2s/(?P<user_id>\d+)/(?P<year>\d+)/\d+/?$")),
+    ("roll_activator", re.compile(r"^/rolls/activator/-?\d+/(?P<year>\d+)/all/all/?$")),
+    ("roll_chaser", re.compile(r"^/rolls/chaser/-?\d+/(?P<year>\d+)/all/all/?$")),
+)
+
+def callsign_for(index):
+    return f"LT{index}X"
+
+def user_index(callsign, users):
+    match = re.fullmatch(r"LT(\d+)X", callsign.upper())
+    if match is None or int(match.group(1)) >= users:
+        return None
+    return int(match.group(1))
+
+class ReplayData:
+    def __init__(self, users=DEFAULT_USERS, seed=0, fixtures=None):
+        self.users = users
+        self.seed = seed
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.summit_codes = synthetic_summit_codes(20_000)
+
+    def _rng(self, *key):
+        return random.Random(f"{self.seed}:{':'.join(map(str, key))}")
+
+    @lru_cache(maxsize=1024)
+    def body(self, path, route, params):
+        # (JSON bytes, ETag) or None for a 404
+        if self.fixtures is not None:
+            fixture = self.fixtures / (path.strip("/") + ".json")
+            if fixture.exists():
+                return self._encode(json.loads(fixture.read_text(encoding="utf-8")))
+
+        params = dict(params)
+        if route == "user_id":
+            index = user_index(params["callsign"], self.users)
+            return None if index is None else self._encode({"userId": FIRST_USER_ID + index})
+
+        if route.startswith("roll_"):
+            return self._encode(self._roll(route == "roll_chaser", int(params["year"])))
+
+        index = int(params["user_id"]) - FIRST_USER_ID
+        if not 0 <= index < self.users:
+            return self._encode([])
+
+        # Long-tailed log sizes, like the real user base
+        year = int(params["year"])
+        rng = self._rng(route, index, year)
+        seed = rng.randrange(1 << 30)
+        if route == "activator":
+            return self._encode(synthetic_activator_log(int(rng.paretovariate(1.2) * 10) % 1000 + 1, self.summit_codes, seed))
+        if route == "s2s":
+            return self._encode(synthetic_s2s_log(rng.randint(0, 40), seed))
+        return self._encode(synthetic_chaser_log(int(rng.paretovariate(1.1) * 200) % 100_000 + 1, self.summit_codes, seed))
+
+    def _roll(self, chaser, year):
+        roll = []
+        for index in range(self.users):
+            rng = self._rng("roll", chaser, index, year)
+            points = rng.randint(1, 60_000)
+            entry = {"Callsign": callsign_for(index), "Username": f"user{index}", "Points": points, "UserID": FIRST_USER_ID + index}
+            if chaser:
+                entry["stationsWorked"] = rng.randint(1, 20_000)
+            else:
+                entry["Summits"] = rng.randint(1, 400)
+                entry["totalPoints"] = points + rng.randint(0, 500)
+            roll.append(entry)
+        return roll
+
+    @staticmethod
+    def _encode(value):
+        body = json.dumps(value, separators=(",", ":")).encode()
+        return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split("?", 1)[0]
+
+        if path == "/_stats":
+            with server.stats_lock:
+                return self._send(200, json.dumps(dict(server.stats)).encode())
+
+        route, params = "unknown", None
+        for name, pattern in ROUTES:
+            match = pattern.match(path)
+            if match:
+                route, params = name, tuple(sorted(match.groupdict().items()))
+                break
+
+        with server.stats_lock:
+            server.stats[route] += 1
+
+        delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter))
+        roll = server.rng.random()
+        if roll < server.stall_rate:
+            # Longer than the client's request deadline
+            time.sleep(server.stall_seconds)
+        elif delay:
+            time.sleep(delay)
+
+        if roll < server.stall_rate + server.error_rate:
+            with server.stats_lock:
+                server.stats["injected_errors"] += 1
+            return self._send(503, b'{"error":"injected"}')
+
+        if params is None:
+            return self._send(404, b"[]")
+
+        found = server.data.body(path, route, params)
+        if found is None:
+            return self._send(404, b'{"error":"not found"}')
+
+        body, etag = found
+        if self.headers.get("If-None-Match") == etag:
+            with server.stats_lock:
+                server.stats["not_modified"] += 1
+            return self._send(304, b"", etag)
+        return self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                stall_rate=0.0, stall_seconds=30.0, users=DEFAULT_USERS, seed=0, fixtures=None):
+    server = ThreadingHTTPServer((host, port), ReplayHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000
+    server.jitter = jitter_ms / 1000
+    server.error_rate = error_rate
+    server.stall_rate = stall_rate
+    server.stall_seconds = stall_seconds
+    server.rng = random.Random(seed)
+    server.data = ReplayData(users, seed, fixtures)
+    server.stats = Counter()
+    server.stats_lock = threading.Lock()
+    return server
+
+def base_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+def serve_in_thread(**options):
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, name="replay-server", daemon=True).start()
+    return server
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mean added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=25.0, help="uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="fraction of requests held past the client deadline")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help=f"synthetic users (callsigns {callsign_for(0)}..)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", type=Path, help="directory of recorded responses, <url path>.json")
+
+def server_options(args):
+    return {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "stall_rate": args.stall_rate,
+        "users": args.users,
+        "seed": args.seed,
+        "fixtures": args.fixtures
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in SOTA API responses for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, **server_options(args))
+    url = base_url(server)
+    print(f"Replaying on {url}; run the app with SOTA_SOTL_URL={url} SOTA_API_URL={url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
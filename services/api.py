@@ -1,100 +1,669 @@
+import asyncio
+import importlib.util
 import httpx
 import streamlit as st
+import hashlib
 import json
+import os
+import random
+import threading
+from concurrent.futures import CancelledError
+from dataclasses import asdict
+from functools import partial
 from pathlib import Path
+from urllib.parse import urlsplit
 import time
+from services import store
+from services.artifacts import atomic_write
+from services.telemetry import count, span, timed
+from services.data import (
+    ACTIVATOR_LOG_FIELDS,
+    CHASER_LOG_FIELDS,
+    CURRENT_YEAR,
+    S2S_LOG_FIELDS,
+    ChaserProfileAggregator,
+    UserYearProfile,
+    honor_roll_files,
+    write_honor_roll_table
+)
 
-CHASER_HONOR_ROLL_FILE = Path("data/chaser_honor_roll_2025.json")
-HONOR_ROLL_FILE = Path("data/honor_roll_2025.json")
+# HTTP/2 is used when the optional h2 package is installed (httpx[http2])
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
 
-@st.cache_data
-def fetch_user_id(callsign: str) -> str | None:
-    url = f"https://sotl.as/api/activators/{callsign}"
+# Retries and circuit breaking for upstream hosts
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.25
+REQUEST_DEADLINE = 20.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+# How long a stored response is served before it is revalidated upstream
+USER_ID_TTL = 24 * 3600
+LOG_TTL = 15 * 60
+
+def log_ttl(year: int) -> float | None:
+    # Closed years' logs never change, so they are stored without expiry
+    return LOG_TTL if year >= CURRENT_YEAR else None
+
+# Upstream base URLs; point both at benchmarks/replay_server.py to run offline
+SOTL_URL = os.environ.get("SOTA_SOTL_URL", "https://sotl.as").rstrip("/")
+SOTA_API_URL = os.environ.get("SOTA_API_URL", "https://api-db2.sota.org.uk").rstrip("/")
+
+LOG_URLS = {
+    "activator": SOTA_API_URL + "/logs/activator/{user_id}/{year}/99999/",
+    "chaser": SOTA_API_URL + "/logs/chaser/{user_id}/{year}/99999/",
+    "s2s": SOTA_API_URL + "/logs/s2s/{user_id}/{year}/0"
+}
+LOG_FIELDS = {
+    "activator": ACTIVATOR_LOG_FIELDS,
+    "chaser": CHASER_LOG_FIELDS,
+    "s2s": S2S_LOG_FIELDS
+}
+
+# -----------------------------
+# Shared client
+# -----------------------------
+# One event loop thread owns a pooled AsyncClient for the whole process, so
+# every Streamlit session reuses the same keep-alive connections.
+_loop = None
+_client = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="sota-api", daemon=True).start()
+
+    return _loop
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+
+    # Only called from the loop thread
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0
+            )
+        )
+
+    return _client
+
+def run_async(coro):
+    # Run a coroutine on the shared client's loop from any thread
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+class CircuitOpenError(httpx.HTTPError):
+    pass
+
+class MalformedResponseError(httpx.HTTPError):
+    # A 2xx whose body is not what the endpoint serves, e.g. a maintenance
+    # page; treated like a server error, so retries and stale copies apply
+    pass
+
+class _CircuitBreaker:
+    # Counts failed calls, not attempts: a call is one failure once its
+    # retries are used up
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+
+        # Half-open: once the cooldown has passed, exactly one probe goes
+        # through; everything else fails fast until it settles
+        if self.probing or time.monotonic() - self.opened_at < BREAKER_COOLDOWN:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.failures >= BREAKER_THRESHOLD:
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        # A probe that was cancelled proved nothing; let the next call probe
+        self.probing = False
+
+# Breakers are only touched from the loop thread
+_breakers = {}
+
+# Upstream fetches in flight, by store key: (endpoint, user_id, year) ->
+# [task, waiters]. Also loop-thread only.
+_inflight = {}
+
+def _is_retryable(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+
+    return isinstance(error, (httpx.TransportError, MalformedResponseError))
+
+class _JsonArrayParser:
+    # Incremental parser for a top-level JSON array of objects: yields each
+    # element as soon as its closing brace has arrived
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, text: str) -> list:
+        buffer = self._buffer + text
+        pos = 0
+        items = []
+
+        while not self._finished:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise MalformedResponseError("Expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                self._finished = True
+                pos += 1
+                break
+
+            try:
+                item, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet
+            items.append(item)
+
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self):
+        if not self._finished or self._buffer.strip():
+            raise MalformedResponseError("Truncated JSON array")
+
+async def _consume_records(response: httpx.Response, consume, fields=None):
+    # Each chunk is parsed, and its records handed to consume(), on a worker
+    # thread: a 100k-QSO log would otherwise stall every session's I/O on
+    # the loop thread. Chunks are still taken one at a time, in order.
+    parser = _JsonArrayParser()
+
+    def feed(text):
+        records = parser.feed(text)
+        if fields is not None:
+            records = [{field: record[field] for field in fields if field in record} for record in records]
+        consume(records)
+
+    async for text in response.aiter_text():
+        await asyncio.to_thread(feed, text)
+
+    parser.close()
+
+async def _read_json(response: httpx.Response):
+    await response.aread()
+    try:
+        return response.json()
+    except ValueError as e:
+        raise MalformedResponseError(f"Invalid JSON body: {e}") from e
+
+def _read_records(fields):
+    async def read(response):
+        records = []
+        await _consume_records(response, records.extend, fields)
+        return records
+    return read
+
+def _read_into(make_aggregator, fields):
+    async def read(response):
+        aggregator = make_aggregator()
+
+        def add(records):
+            for record in records:
+                aggregator.add(record)
+
+        await _consume_records(response, add, fields)
+        return aggregator
+    return read
+
+async def _request(url: str, timeout: float, headers: dict, read=_read_json):
+    host = urlsplit(url).netloc
+    breaker = _breakers.setdefault(host, _CircuitBreaker())
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {host}")
+
+    try:
+        result = await _request_with_retries(url, host, timeout, headers, read)
+    except httpx.HTTPError as e:
+        if _is_retryable(e):
+            breaker.record_failure()
+        else:
+            # The host answered, just not with what was asked for
+            breaker.record_success()
+        raise
+    except BaseException:
+        breaker.release_probe()
+        raise
+
+    breaker.record_success()
+    return result
+
+async def _request_with_retries(url: str, host: str, timeout: float, headers: dict, read):
+    # read consumes the streamed body; it runs again from scratch on a retry
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + REQUEST_DEADLINE
+
+    for attempt in range(RETRY_ATTEMPTS):
+        remaining = deadline - loop.time()
+        try:
+            # One span per attempt, labelled by host, to tell upstreams apart
+            with span("upstream", host):
+                async with _get_client().stream("GET", url, headers=headers, timeout=min(timeout, remaining)) as response:
+                    data = None
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                        data = await read(response)
+        except httpx.HTTPError as e:
+            if not _is_retryable(e):
+                raise
+
+            # Full jitter, but never sleep past the deadline
+            delay = random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt)
+            if attempt == RETRY_ATTEMPTS - 1 or loop.time() + delay >= deadline:
+                raise
+
+            await asyncio.sleep(delay)
+            continue
+
+        return response, data
+
+async def _get_json(url: str, key: tuple | None, ttl: float | None, timeout: float = 10.0, fields=None,
+                    aggregate=None):
+    # key is (endpoint, user_id, year) in the shared on-disk store; None
+    # bypasses the store entirely. With fields, the body is streamed and
+    # only those fields of each record are kept. With aggregate, the records
+    # are fed into aggregate() as they arrive, and its deferred profile, as
+    # a dict, is returned and stored in place of the log.
+    fetch = partial(_fetch_json, url, key, ttl, timeout, fields, aggregate)
+    if key is None:
+        return await fetch()
+
+    # Singleflight: every caller asking for a key while it is being fetched
+    # waits on the same task, so a herd of sessions costs one upstream request
+    entry = _inflight.get(key)
+    if entry is None:
+        count("singleflight", "leader")
+        entry = _inflight[key] = [asyncio.ensure_future(fetch()), 0]
+        entry[0].add_done_callback(lambda task: _forget_inflight(key, entry))
+    else:
+        count("singleflight", "joined")
+
+    entry[1] += 1
+    try:
+        # Shielded, so one waiter being cancelled doesn't fail the others
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and not entry[0].done():
+            # Nobody is left waiting (e.g. a released prefetch)
+            _forget_inflight(key, entry)
+            entry[0].cancel()
+
+def _forget_inflight(key, entry):
+    if _inflight.get(key) is entry:
+        del _inflight[key]
 
+async def _fetch_json(url: str, key: tuple | None, ttl: float | None, timeout: float, fields, aggregate):
+    cached = None
+    if key is not None:
+        cached = await asyncio.to_thread(store.get_response, *key)
+    if cached is not None and cached.is_fresh():
+        count("response_store", "hit")
+        return json.loads(cached.body)
+    if key is not None:
+        count("response_store", "miss" if cached is None else "stale")
+
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    if aggregate is not None:
+        read = _read_into(aggregate, fields)
+    elif fields is not None:
+        read = _read_records(fields)
+    else:
+        read = _read_json
+    try:
+        response, data = await _request(url, timeout, headers, read)
+    except httpx.HTTPError as e:
+        # Serve the last good response while the upstream is struggling
+        if cached is not None and (_is_retryable(e) or isinstance(e, CircuitOpenError)):
+            return json.loads(cached.body)
+        raise
+
+    if response.status_code == 304 and cached is not None:
+        await asyncio.to_thread(store.touch_response, *key, ttl)
+        return json.loads(cached.body)
+
+    if aggregate is not None:
+        data = asdict(await asyncio.to_thread(data.build, deferred=True))
+
+    if key is not None:
+        body = response.text if fields is None and aggregate is None else json.dumps(data, separators=(",", ":"))
+        await asyncio.to_thread(
+            store.put_response, *key, body,
+            response.headers.get("ETag"), response.headers.get("Last-Modified"), ttl
+        )
+
+    return data
+
+# -----------------------------
+# Async fetchers
+# -----------------------------
+def _is_not_found(error: httpx.HTTPError) -> bool:
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404
+
+async def _fetch_user_id(callsign: str) -> str | None:
+    # Raises when the upstream fails; None only for an unknown callsign
+    url = f"{SOTL_URL}/api/activators/{callsign}"
+
+    try:
+        data = await _get_json(url, ("activators", callsign.upper(), 0), USER_ID_TTL)
+    except httpx.HTTPError as e:
+        if _is_not_found(e):
+            return None
+        raise
+    return data.get("userId")
+
+async def _fetch_chaser_profile(user_id: str, year: int) -> UserYearProfile:
+    # The chaser log (up to ~100k QSOs) is counted as it streams in; only
+    # the profile is kept and stored, so memory stays bounded by one chunk
+    url = LOG_URLS["chaser"].format(user_id=user_id, year=year)
+    aggregate = partial(ChaserProfileAggregator, year)
+
+    try:
+        profile = await _get_json(
+            url, ("profiles/chaser", user_id, year), log_ttl(year), fields=LOG_FIELDS["chaser"], aggregate=aggregate
+        )
+    except httpx.HTTPError as e:
+        if _is_not_found(e):
+            return aggregate().build(deferred=True)
+        raise
+    return UserYearProfile.from_dict(profile)
+
+async def _fetch_log(kind: str, user_id: str, year: int, cache: bool = True) -> list:
+    # Raises when the upstream fails; [] only when there is no log
+    url = LOG_URLS[kind].format(user_id=user_id, year=year)
+
+    try:
+        key = (f"logs/{kind}", user_id, year) if cache else None
+        return await _get_json(url, key, log_ttl(year), fields=LOG_FIELDS[kind])
+    except httpx.HTTPError as e:
+        if _is_not_found(e):
+            return []
+        raise
+
+@timed("api")
+async def fetch_user_id_async(callsign: str) -> str | None:
     try:
-        response = httpx.get(url, timeout=10.0)
-        response.raise_for_status()
-        return response.json().get("userId")
+        return await _fetch_user_id(callsign)
     except httpx.HTTPError:
         return None
 
-def fetch_activations(user_id: str, year: int = 2025) -> list:
-
-    url = f"https://api-db2.sota.org.uk/logs/activator/{user_id}/{year}/99999/"
+@timed("api")
+async def fetch_log_async(kind: str, user_id: str, year: int = CURRENT_YEAR, cache: bool = True) -> list:
+    # Unlike the per-log fetchers below, raises when the upstream fails
+    return await _fetch_log(kind, user_id, year, cache)
 
+@timed("api")
+async def fetch_activations_async(user_id: str, year: int = CURRENT_YEAR, cache: bool = True) -> list:
     try:
-        response = httpx.get(url, timeout=10.0)
-        response.raise_for_status()
-        return response.json()
+        return await _fetch_log("activator", user_id, year, cache)
     except httpx.HTTPError:
         return []
 
-def fetch_chaser_data(user_id: str, year: int = 2025) -> list:
-
-    url = f"https://api-db2.sota.org.uk/logs/chaser/{user_id}/{year}/99999/"
+@timed("api")
+async def fetch_chaser_data_async(user_id: str, year: int = CURRENT_YEAR, cache: bool = True) -> list:
+    try:
+        return await _fetch_log("chaser", user_id, year, cache)
+    except httpx.HTTPError:
+        return []
 
+@timed("api")
+async def fetch_s2s_data_async(user_id: str, year: int = CURRENT_YEAR, cache: bool = True) -> list:
     try:
-        response = httpx.get(url, timeout=10.0)
-        response.raise_for_status()
-        return response.json()
+        return await _fetch_log("s2s", user_id, year, cache)
     except httpx.HTTPError:
         return []
 
-def fetch_honor_roll() -> list:
-    url = "https://api-db2.sota.org.uk/rolls/activator/-1/2025/all/all"
+@timed("api")
+async def fetch_user_data_async(
+    callsign: str, user_id: str | None = None, year: int = CURRENT_YEAR, roles=("Activator", "Chaser")
+) -> dict:
+    # Raises httpx.HTTPError when a fetch fails and no stored copy can stand
+    # in, so callers never cache an outage as an empty log. Only the logs of
+    # the given roles are fetched; the others come back empty.
 
-    try:
-        response = httpx.get(url, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        sanitized_data = []
+    # The logs are keyed by UserID, so sotl.as is only asked when the caller
+    # could not resolve it locally
+    if user_id is None:
+        user_id = await _fetch_user_id(callsign)
 
-        for entry in data:
-            sanitized_entry = entry.copy()
-            sanitized_entry.pop("Username", None)
-            sanitized_data.append(sanitized_entry)
+    empty = ChaserProfileAggregator(year).build(deferred=True)
+    if user_id is None:
+        return {"user_id": None, "activations": [], "s2s": [], "chaser_profile": empty, "versions": {}}
 
-        # Save to disk
-        HONOR_ROLL_FILE.parent.mkdir(exist_ok=True)
-        with open(HONOR_ROLL_FILE, "w", encoding="utf-8") as f:
-            json.dump(sanitized_data, f, indent=2)
+    fetches = {}
+    if "Activator" in roles:
+        fetches["activations"] = _fetch_log("activator", user_id, year)
+        fetches["s2s"] = _fetch_log("s2s", user_id, year)
+    if "Chaser" in roles:
+        fetches["chaser_profile"] = _fetch_chaser_profile(user_id, year)
+    fetched = dict(zip(fetches, await asyncio.gather(*fetches.values())))
 
-        return data
+    return {
+        "user_id": user_id,
+        "activations": fetched.get("activations", []),
+        "s2s": fetched.get("s2s", []),
+        "chaser_profile": fetched.get("chaser_profile", empty),
+        "versions": await asyncio.to_thread(fetch_log_versions, user_id, year)
+    }
 
-    except httpx.HTTPError:
-        return []
+@timed("api")
+async def fetch_user_years_async(callsign: str, user_id: str | None, years, role: str) -> dict:
+    # Several years of one role's logs at once; closed years are normally
+    # served by the store
+    if user_id is None:
+        user_id = await fetch_user_id_async(callsign)
+
+    results = await asyncio.gather(*(fetch_user_data_async(callsign, user_id, year, (role,)) for year in years))
+    return dict(zip(years, results))
+
+@timed("api")
+async def stream_log_async(kind: str, user_id: str, year: int, make_aggregator):
+    # Feed a log straight into a fresh aggregator as it downloads; neither
+    # the body nor the record list is ever held in full
+    url = LOG_URLS[kind].format(user_id=user_id, year=year)
+    _, aggregator = await _request(url, 30.0, {}, _read_into(make_aggregator, LOG_FIELDS[kind]))
+    return aggregator
 
-def fetch_chaser_honor_roll() -> list:
-    url = "https://api-db2.sota.org.uk/rolls/chaser/-1/2025/all/all"
+# -----------------------------
+# Sync entry points
+# -----------------------------
+def fetch_log_versions(user_id: str, year: int = CURRENT_YEAR) -> dict:
+    # When each stored log body last changed; cheap keys for derived results
+    return {
+        "activations": store.get_version("logs/activator", user_id, year),
+        "s2s": store.get_version("logs/s2s", user_id, year),
+        "chaser": store.get_version("profiles/chaser", user_id, year)
+    }
 
+@st.cache_data
+def fetch_user_id(callsign: str) -> str | None:
+    return run_async(fetch_user_id_async(callsign))
+
+def fetch_activations(user_id: str, year: int = CURRENT_YEAR) -> list:
+    return run_async(fetch_activations_async(user_id, year))
+
+def fetch_chaser_data(user_id: str, year: int = CURRENT_YEAR) -> list:
+    return run_async(fetch_chaser_data_async(user_id, year))
+
+def fetch_s2s_data(user_id: str, year: int = CURRENT_YEAR) -> list:
+    return run_async(fetch_s2s_data_async(user_id, year))
+
+def fetch_user_years(callsign: str, user_id: str | None, years, role: str) -> dict:
+    return run_async(fetch_user_years_async(callsign, user_id, tuple(years), role))
+
+def fetch_user_data(callsign: str, user_id: str | None = None, year: int = CURRENT_YEAR) -> dict:
+    # Join a speculative prefetch of the same user rather than fetching twice
+    prefetch = _hold_prefetch(callsign, year)
+    if prefetch is not None:
+        try:
+            return prefetch.result()
+        except CancelledError:
+            pass
+        finally:
+            release_prefetch(callsign, prefetch, year)
+
+    return run_async(fetch_user_data_async(callsign, user_id, year))
+
+def _file_digest(path: Path) -> str | None:
     try:
-        response = httpx.get(url, timeout=30.0)
-        response.raise_for_status()
-        data = response.json()
-        sanitized_data = []
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None
+
+async def _refresh_roll_async(url: str, timeout: float, json_path: Path, table_path: Path) -> list:
+    async def read(response):
+        # Drop Username from each entry as it streams in
+        entries = []
+
+        def keep(records):
+            for entry in records:
+                entry.pop("Username", None)
+            entries.extend(records)
+
+        await _consume_records(response, keep)
+        return entries
+
+    _, entries = await _request(url, timeout, {}, read)
+
+    def build_table(tmp_path):
+        # Unchanged since the last refresh: leave the published files alone
+        if _file_digest(tmp_path) == _file_digest(json_path):
+            return False
+        # The rename keeps mtime and size, so a table built against the temp
+        # file already matches the published JSON
+        write_honor_roll_table(entries, table_path, tmp_path)
 
-        for entry in data:
-            sanitized_entry = entry.copy()
-            sanitized_entry.pop("Username", None)
-            sanitized_data.append(sanitized_entry)
+    def publish():
+        # Readers keep seeing the old file until the rename
+        with atomic_write(json_path, "w", encoding="utf-8", before_replace=build_table) as f:
+            f.write("[")
+            for i, entry in enumerate(entries):
+                f.write(("," if i else "") + "\n  " + json.dumps(entry))
+            f.write("\n]\n")
 
-        # Save to disk
-        CHASER_HONOR_ROLL_FILE.parent.mkdir(exist_ok=True)
-        with open(CHASER_HONOR_ROLL_FILE, "w", encoding="utf-8") as f:
-            json.dump(sanitized_data, f, indent=2)
+    await asyncio.to_thread(publish)
+    return entries
 
-        return data
+@timed("api")
+async def fetch_honor_roll_async(year: int = CURRENT_YEAR) -> list:
+    url = f"{SOTA_API_URL}/rolls/activator/-1/{year}/all/all"
 
+    try:
+        return await _refresh_roll_async(url, 10.0, *honor_roll_files("Activator", year))
     except httpx.HTTPError:
         return []
 
-def fetch_s2s_data(user_id: str, year: int = 2025) -> list:
-
-    url = f"https://api-db2.sota.org.uk/logs/s2s/{user_id}/{year}/0"
+@timed("api")
+async def fetch_chaser_honor_roll_async(year: int = CURRENT_YEAR) -> list:
+    url = f"{SOTA_API_URL}/rolls/chaser/-1/{year}/all/all"
 
     try:
-        response = httpx.get(url, timeout=10.0)
-        response.raise_for_status()
-        return response.json()
+        return await _refresh_roll_async(url, 30.0, *honor_roll_files("Chaser", year))
     except httpx.HTTPError:
         return []
+
+def fetch_honor_roll(year: int = CURRENT_YEAR) -> list:
+    return run_async(fetch_honor_roll_async(year))
+
+def fetch_chaser_honor_roll(year: int = CURRENT_YEAR) -> list:
+    return run_async(fetch_chaser_honor_roll_async(year))
+
+# -----------------------------
+# Speculative prefetch
+# -----------------------------
+# In-flight fetch_user_data runs started before the user pressed Start, keyed
+# by (callsign, year) and shared by every session that asked for the same
+# user. Each holder releases its claim; the last one out cancels the run.
+_prefetches = {}
+_prefetch_lock = threading.RLock()
+
+def _hold_prefetch(callsign: str, year: int):
+    with _prefetch_lock:
+        entry = _prefetches.get((callsign.upper(), year))
+        if entry is None:
+            return None
+        entry[1] += 1
+        return entry[0]
+
+def _forget_prefetch(key, future):
+    with _prefetch_lock:
+        entry = _prefetches.get(key)
+        if entry is not None and entry[0] is future:
+            del _prefetches[key]
+
+def prefetch_user_data(callsign: str, user_id: str | None = None, year: int = CURRENT_YEAR):
+    # Returns the run's future, the holder's handle for release_prefetch
+    key = (callsign.upper(), year)
+
+    with _prefetch_lock:
+        future = _hold_prefetch(callsign, year)
+        if future is not None:
+            return future
+
+        future = asyncio.run_coroutine_threadsafe(fetch_user_data_async(callsign, user_id, year), _get_loop())
+        _prefetches[key] = [future, 1]
+
+    # Finished runs have written their logs to the response store, which
+    # serves every later fetch; the registry only tracks what is in flight
+    future.add_done_callback(lambda _: _forget_prefetch(key, future))
+    return future
+
+def release_prefetch(callsign: str, future, year: int = CURRENT_YEAR) -> None:
+    key = (callsign.upper(), year)
+
+    with _prefetch_lock:
+        entry = _prefetches.get(key)
+        if entry is None or entry[0] is not future:
+            return
+
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _prefetches[key]
+            # Cancels the task on the loop, which closes its open requests
+            entry[0].cancel()
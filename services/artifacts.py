@@ -0,0 +1,93 @@
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# Binary tables: fixed header, JSON dtype description, then aligned rows that
+# can be memory-mapped straight from disk.
+MAGIC = b"SOTAUW"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<6sHqqI")  # magic, version, source mtime_ns, source size, meta length
+_ALIGN = 64
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb", encoding: str | None = None, before_replace=None):
+    # Write to a temp file beside path and rename it over path, so readers
+    # only ever see the old file or the whole new one. before_replace(tmp_path)
+    # runs once the file is closed; returning False discards it instead.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    replaced = False
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.chmod(tmp_path, 0o644)
+        if before_replace is None or before_replace(Path(tmp_path)) is not False:
+            os.replace(tmp_path, path)
+            replaced = True
+    finally:
+        if not replaced:
+            os.unlink(tmp_path)
+
+
+def write_table(path: Path, table: np.ndarray, source: Path, signature: tuple[int, int] | None = None) -> None:
+    # signature: the source's, taken before the table's rows were read from
+    # it. If the source has been replaced since, the table is already stale
+    # and whoever replaced it owns the table, so nothing is written.
+    current = file_signature(source)
+    if signature is not None and signature != current:
+        return
+    mtime_ns, size = signature or current or (0, 0)
+    meta = json.dumps({
+        "descr": np.lib.format.dtype_to_descr(table.dtype),
+        "rows": len(table),
+    }).encode()
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, mtime_ns, size, len(meta)) + meta
+    header += b"\0" * (-len(header) % _ALIGN)
+
+    # Readers never map a half-written table
+    with atomic_write(path) as f:
+        f.write(header)
+        f.write(np.ascontiguousarray(table).tobytes())
+
+
+def load_table(path: Path, source: Path) -> np.ndarray | None:
+    # Returns None when the table is missing, unreadable or older than its source
+    try:
+        with open(path, "rb") as f:
+            magic, version, mtime_ns, size, meta_len = _HEADER.unpack(f.read(_HEADER.size))
+            meta = json.loads(f.read(meta_len))
+    except (OSError, struct.error, ValueError):
+        return None
+
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+
+    signature = file_signature(source)
+    if signature is not None and signature != (mtime_ns, size):
+        return None
+
+    descr = meta["descr"]
+    if isinstance(descr, list):
+        descr = [tuple(field) for field in descr]
+    dtype = np.lib.format.descr_to_dtype(descr)
+    if meta["rows"] == 0:
+        return np.zeros(0, dtype=dtype)
+
+    offset = _HEADER.size + meta_len
+    offset += -offset % _ALIGN
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(meta["rows"],))
@@ -1,16 +1,99 @@
 from collections import Counter
+from dataclasses import asdict, dataclass
 from datetime import datetime
 import csv
 import json
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from types import MappingProxyType
+from services.artifacts import file_signature, load_table, write_table
+from services.telemetry import count, timed
 
-CHASER_HONOR_ROLL_FILE = Path("data/chaser_honor_roll_2025.json")
-HONOR_ROLL_FILE = Path("data/honor_roll_2025.json")
-SUMMITSLIST_CSV = Path("data/summitslist.csv")
+# The newest year the app unwraps, whose logs are still being uploaded;
+# every earlier year is closed
+CURRENT_YEAR = 2025
+
+def honor_roll_files(role: str, year: int = CURRENT_YEAR) -> tuple[Path, Path]:
+    # (JSON, binary table) for one year's activator or chaser roll
+    name = "honor_roll" if role == "Activator" else "chaser_honor_roll"
+    return Path(f"data/{name}_{year}.json"), Path(f"data/{name}_{year}.bin")
 
+HONOR_ROLL_FILE, HONOR_ROLL_TABLE_FILE = honor_roll_files("Activator")
+CHASER_HONOR_ROLL_FILE, CHASER_HONOR_ROLL_TABLE_FILE = honor_roll_files("Chaser")
+SUMMITSLIST_CSV = Path("data/summitslist.csv")
+SUMMIT_INDEX_FILE = Path("data/summitslist.idx")
+
+# Typed columns of the binary honor-roll tables; -1 marks a missing value
+HONOR_ROLL_COLUMNS = ("UserID", "Points", "totalPoints", "Summits", "stationsWorked")
+
+ACTIVATOR_BAND_KEYS = {
+    "QSO160": "160m", "QSO80": "80m", "QSO60": "60m", "QSO40": "40m",
+    "QSO30": "30m", "QSO20": "20m", "QSO17": "17m", "QSO15": "15m",
+    "QSO12": "12m", "QSO10": "10m", "QSO6": "6m", "QSO4": "4m",
+    "QSO2": "2m", "QSO70c": "70cm", "QSO23c": "23cm"
+}
+ACTIVATOR_BAND_ORDER = ["160m","80m","60m","40m","30m","20m","17m","15m",
+                        "12m","10m","6m","4m","2m","70cm","23cm"]
+ACTIVATOR_MODE_KEYS = {"QSOssb": "SSB", "QSOfm": "FM", "QSOcw": "CW"}
+ACTIVATOR_MODE_ORDER = ["SSB","CW","FM"]
+CHASER_BAND_ORDER = [
+    "VLF","1.8MHz","3.5MHz","5MHz","7MHz","10MHz","14MHz","18MHz",
+    "21MHz","24MHz","28MHz","40MHz","50MHz","60MHz","70MHz",
+    "144MHz","220MHz","433MHz","900MHz","1240MHz",
+    "2.3GHz","3.4GHz","5.6GHz","10GHz","24GHz","Microwave"
+]
+CHASER_MODE_ORDER = ["AM", "CW", "DATA", "DV", "FM", "OTHER", "SSB"]
+
+# The only log fields the slides read; everything else is dropped on ingest
+ACTIVATOR_LOG_FIELDS = (
+    "ActivationDate", "SummitCode", "Summit", "Total", "QSOs",
+    *ACTIVATOR_BAND_KEYS, *ACTIVATOR_MODE_KEYS
+)
+S2S_LOG_FIELDS = ("Total",)
+CHASER_LOG_FIELDS = ("Band", "Mode", "SummitCode", "Total")
+
+# QSOs a chaser profile counts at once: large enough to amortize pandas'
+# per-call overhead, small enough to keep a streamed log's buffer bounded
+AGGREGATE_CHUNK_ROWS = 10_000
+
+# Process-wide values derived from data files, reloaded when the files change
+_resident = {}
+_resident_lock = threading.Lock()
+
+def _load_resident(name, sources, loader):
+    signature = tuple(file_signature(path) for path in sources)
+
+    cached = _resident.get(name)
+    if cached is not None and cached[0] == signature:
+        count("resident", "hit")
+        return cached[1]
+
+    with _resident_lock:
+        cached = _resident.get(name)
+        if cached is not None and cached[0] == signature:
+            count("resident", "hit")
+            return cached[1]
+
+        count("resident", "miss")
+        value = loader()
+        # Loaders may write one of the sources (a rebuilt table), so sign
+        # what is on disk now rather than reloading on the next call
+        signature = tuple(file_signature(path) for path in sources)
+        _resident[name] = (signature, value)
+        return value
+
+def freeze_log(data) -> tuple:
+    # Read-only records, safe to hand the same object to every session
+    return tuple(MappingProxyType(record) for record in data)
+
+@timed("data")
 def get_points_total(data):
 
+    if not data:
+        return 0
+
     max_total = max(
     data,
     key=lambda a: a["Total"]
@@ -18,6 +101,7 @@ def get_points_total(data):
 
     return max_total["Total"]
 
+@timed("data")
 def get_most_qsos_activation(activation_data):
 
     most_qsos_activation = max(
@@ -27,18 +111,22 @@ def get_most_qsos_activation(activation_data):
 
     return most_qsos_activation
 
+@timed("data")
 def count_activations(activation_data):
 
     return len(activation_data)
 
+@timed("data")
 def count_s2s_qsos(s2s_data):
 
     return len(s2s_data)
 
+@timed("data")
 def count_chaser_qsos(chaser_data):
 
     return len(chaser_data)
 
+@timed("data")
 def most_popular_month_with_season(activation_data):
     # Extract months from activation dates
     months = []
@@ -57,33 +145,77 @@ def most_popular_month_with_season(activation_data):
 
     # Determine season based on month number
     month_number = datetime.strptime(most_common_month_str, "%B %Y").month
-    if month_number in [5, 6, 7, 8]:
-        season = "Summer"
-    elif month_number in [12, 1, 2]:
-        season = "Winter"
-    else:
-        season = "Awesome"
+    season = _season_for_month(month_number)
 
     return most_common_month_str, season, count
 
-def get_percentile_bucket(user_total_points):
-
-    with open(HONOR_ROLL_FILE, "r", encoding="utf-8") as f:
-        honor_roll = json.load(f)
+def _season_for_month(month_number):
+    if month_number in [5, 6, 7, 8]:
+        return "Summer"
+    elif month_number in [12, 1, 2]:
+        return "Winter"
+    else:
+        return "Awesome"
 
-    # Extract and sort all total points (descending)
-    totals = sorted(
-        [u["totalPoints"] for u in honor_roll if "totalPoints" in u],
-        reverse=True
+def write_honor_roll_table(entries, table_path: Path, source_path: Path, signature=None) -> np.ndarray:
+    callsigns = np.array(
+        [entry.get("Callsign", "").upper().strip().encode("utf-8") for entry in entries],
+        dtype=bytes
     )
 
-    if not totals:
+    table = np.empty(
+        len(entries),
+        dtype=[("Callsign", callsigns.dtype)] + [(column, "<i4") for column in HONOR_ROLL_COLUMNS]
+    )
+    table["Callsign"] = callsigns
+    for column in HONOR_ROLL_COLUMNS:
+        table[column] = [
+            -1 if entry.get(column) is None else int(entry[column])
+            for entry in entries
+        ]
+
+    write_table(table_path, table, source_path, signature)
+    return table
+
+def load_honor_roll_table(table_path: Path, source_path: Path) -> np.ndarray | None:
+    table = load_table(table_path, source_path)
+    if table is not None and set(HONOR_ROLL_COLUMNS) <= set(table.dtype.names):
+        return table
+
+    # Missing, stale or from an older layout: rebuild from the JSON, signed
+    # as it was before reading, in case a refresh replaces it meanwhile
+    signature = file_signature(source_path)
+    if signature is None:
+        return None
+
+    try:
+        with open(source_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error reading {source_path}: {e}")
+        return None
+
+    return write_honor_roll_table(entries, table_path, source_path, signature)
+
+def _load_sorted_points(table_path, source_path, column):
+    table = load_honor_roll_table(table_path, source_path)
+    if table is None:
+        return np.zeros(0, dtype=np.int64)
+
+    # Ascending, so users above a total can be found with a binary search
+    points = table[column]
+    return np.sort(points[points >= 0])
+
+def _percentile_bucket(totals, user_total_points):
+
+    if len(totals) == 0:
         return None, "No data"
 
     total_users = len(totals)
 
     # Find how many users have MORE points than this user
-    users_above = sum(1 for t in totals if t > user_total_points)
+    # Search with the table's own dtype, or numpy upcasts the whole array
+    users_above = total_users - int(np.searchsorted(totals, totals.dtype.type(user_total_points), side="right"))
 
     # Percentile rank (e.g. top 10%)
     percentile = (users_above / total_users) * 100
@@ -102,220 +234,102 @@ def get_percentile_bucket(user_total_points):
 
     return round(percentile, 1), bucket
 
-def get_chaser_percentile_bucket(user_total_points):
+@timed("data")
+def get_percentile_bucket(user_total_points, year=CURRENT_YEAR):
+    source_path, table_path = honor_roll_files("Activator", year)
 
-    with open(CHASER_HONOR_ROLL_FILE, "r", encoding="utf-8") as f:
-        honor_roll = json.load(f)
-
-    # Extract and sort all points (descending)
-    totals = sorted(
-        [u["Points"] for u in honor_roll if "Points" in u],
-        reverse=True
+    totals = _load_resident(
+        f"activator_points_{year}",
+        (source_path, table_path),
+        lambda: _load_sorted_points(table_path, source_path, "totalPoints")
     )
 
-    if not totals:
-        return None, "No data"
+    return _percentile_bucket(totals, user_total_points)
 
-    total_users = len(totals)
+@timed("data")
+def get_chaser_percentile_bucket(user_total_points, year=CURRENT_YEAR):
+    source_path, table_path = honor_roll_files("Chaser", year)
 
-    # Find how many users have MORE points than this user
-    users_above = sum(1 for t in totals if t > user_total_points)
+    totals = _load_resident(
+        f"chaser_points_{year}",
+        (source_path, table_path),
+        lambda: _load_sorted_points(table_path, source_path, "Points")
+    )
 
-    # Percentile rank (e.g. top 10%)
-    percentile = (users_above / total_users) * 100
+    return _percentile_bucket(totals, user_total_points)
 
-    # Bucket logic
-    if percentile <= 10:
-        bucket = "Top 10%"
-    elif percentile <= 20:
-        bucket = "Top 20%"
-    elif percentile <= 30:
-        bucket = "Top 30%"
-    elif percentile <= 50:
-        bucket = "Top 50%"
-    else:
-        bucket = "Below Top 50%"
-
-    return round(percentile, 1), bucket
+def get_role_percentile_bucket(role, user_total_points, year=CURRENT_YEAR):
+    if role == "Activator":
+        return get_percentile_bucket(user_total_points, year)
+    return get_chaser_percentile_bucket(user_total_points, year)
 
 
+@timed("data")
 def get_total_elevation_gain(activation_data: list) -> int:
-    total_elevation = 0
-
-    for activation in activation_data:
-        summit_code = activation.get("SummitCode")
-        if not summit_code:
-            continue
-
-        elevation = fetch_summit_elevation(summit_code)
-        total_elevation += elevation
-
-    return total_elevation
-
-def get_qsos_per_band(activation_data):
-    band_keys = ["QSO160","QSO80","QSO60","QSO40","QSO30","QSO20",
-                 "QSO17","QSO15","QSO12","QSO10","QSO6","QSO4","QSO2",
-                 "QSO70c","QSO23c"]
-
-    # Map keys to human-readable names
-    band_map = {}
-    for band in band_keys:
-        if band.endswith("c"):
-            band_map[band] = band.replace("QSO","").replace("c","cm")
-        else:
-            band_map[band] = band.replace("QSO","") + "m"
-
-    # Initialize totals
-    band_totals = {name: 0 for name in band_map.values()}
-
-    # Sum QSOs across activations
-    for act in activation_data:
-        for band, band_name in band_map.items():
-            band_totals[band_name] += act.get(band, 0)
-
-    # Convert to DataFrame
-    df = pd.DataFrame({
-        "Band": list(band_totals.keys()),
-        "QSOs": list(band_totals.values())
-    })
-
-    # Filter out zero QSOs
-    df = df[df["QSOs"] > 0].reset_index(drop=True)
-
-    # Correct order
-    band_order = ["160m","80m","60m","40m","30m","20m","17m","15m",
-                  "12m","10m","6m","4m","2m","70cm","23cm"]
-    df["Band"] = pd.Categorical(df["Band"], categories=band_order, ordered=True)
-    df = df.sort_values("Band").reset_index(drop=True)
-
-    if not df.empty:
-        most_popular_row = df.loc[df["QSOs"].idxmax()]
-        most_popular_band = most_popular_row["Band"]
-        most_popular_band_qsos = int(most_popular_row["QSOs"])
-    else:
-        most_popular_band = None
-        most_popular_band_qsos = 0
-
-    return df, most_popular_band, most_popular_band_qsos
-
-def get_qsos_per_band_chaser(chaser_data):
-    band_order = [
-        "VLF","1.8MHz","3.5MHz","5MHz","7MHz","10MHz","14MHz","18MHz",
-        "21MHz","24MHz","28MHz","40MHz","50MHz","60MHz","70MHz",
-        "144MHz","220MHz","433MHz","900MHz","1240MHz",
-        "2.3GHz","3.4GHz","5.6GHz","10GHz","24GHz","Microwave"
+    summit_codes = [
+        activation["SummitCode"]
+        for activation in activation_data
+        if activation.get("SummitCode")
     ]
 
-    band_totals = {band: 0 for band in band_order}
-
-    # Count QSOs
-    for qso in chaser_data:
-        band = qso.get("Band")
-        if band in band_totals:
-            band_totals[band] += 1
-
-    # Build DataFrame
-    df = pd.DataFrame({
-        "Band": list(band_totals.keys()),
-        "QSOs": list(band_totals.values())
-    })
-
-    # Remove zero rows
-    df = df[df["QSOs"] > 0].reset_index(drop=True)
-
-    # Apply correct ordering
-    df["Band"] = pd.Categorical(df["Band"], categories=band_order, ordered=True)
-    df = df.sort_values("Band").reset_index(drop=True)
-
-    # Most popular band
-    if not df.empty:
-        top = df.loc[df["QSOs"].idxmax()]
-        most_popular_band = top["Band"]
-        most_popular_band_qsos = int(top["QSOs"])
-    else:
-        most_popular_band = None
-        most_popular_band_qsos = 0
+    return int(_lookup_elevations(summit_codes).sum())
 
-    return df, most_popular_band, most_popular_band_qsos
+def load_log_frame(data, columns) -> pd.DataFrame:
+    # Load a log once as columns; frames are passed through so several
+    # aggregations can share one load
+    if isinstance(data, pd.DataFrame):
+        return data.reindex(columns=columns)
 
-def get_qsos_per_mode(activation_data):
-    mode_keys = ["QSOssb","QSOfm","QSOcw"]
-
-    # Map keys to human-readable names
-    mode_map = {}
-    for mode in mode_keys:
-        mode_map[mode] = mode.replace("QSO","").upper()
-
-    # Initialize totals
-    mode_totals = {name: 0 for name in mode_map.values()}
+    # Plain object columns: converting 100k band/mode strings to pandas'
+    # string dtype costs more than the counting itself
+    return pd.DataFrame(
+        {column: [row.get(column) for row in data] for column in columns},
+        dtype=object
+    )
 
-    # Sum QSOs across activations
-    for act in activation_data:
-        for mode, mode_name in mode_map.items():
-            mode_totals[mode_name] += act.get(mode, 0)
+def _totals_frame(totals: pd.Series, label, order):
+    totals = totals.reindex(order, fill_value=0).to_numpy(dtype=np.int64)
+    present = totals > 0
 
-    # Convert to DataFrame
     df = pd.DataFrame({
-        "Mode": list(mode_totals.keys()),
-        "QSOs": list(mode_totals.values())
+        label: pd.Categorical(np.array(order)[present], categories=order, ordered=True),
+        "QSOs": totals[present]
     })
 
-    # Filter out zero QSOs
-    df = df[df["QSOs"] > 0].reset_index(drop=True)
-
-    # Correct order
-    mode_order = ["SSB","CW","FM"]
-    df["Mode"] = pd.Categorical(df["Mode"], categories=mode_order, ordered=True)
-    df = df.sort_values("Mode").reset_index(drop=True)
-
-    if not df.empty:
-        most_popular_row = df.loc[df["QSOs"].idxmax()]
-        most_popular_mode = most_popular_row["Mode"]
-        most_popular_mode_qsos = int(most_popular_row["QSOs"])
-    else:
-        most_popular_mode = None
-        most_popular_mode_qsos = 0
+    if df.empty:
+        return df, None, 0
 
-    return df, most_popular_mode, most_popular_mode_qsos
+    # argmax picks the first highest row in display order, like idxmax did
+    top = int(np.argmax(df["QSOs"].to_numpy()))
+    return df, df[label].iloc[top], int(df["QSOs"].iloc[top])
 
-def get_qsos_per_mode_chaser(chaser_data):
-    mode_order = [
-        "AM", "CW", "DATA", "DV", "FM", "OTHER", "SSB"
-    ]
+def _column_sums(data, key_names, label, order):
+    frame = load_log_frame(data, list(key_names))
+    totals = frame.fillna(0).astype(np.int64).sum().rename(index=key_names)
+    return _totals_frame(totals, label, order)
 
-    mode_totals = {mode: 0 for mode in mode_order}
+def _value_counts(data, column, order):
+    frame = load_log_frame(data, [column])
+    return _totals_frame(frame[column].value_counts(), column, order)
 
-    # Count QSOs
-    for qso in chaser_data:
-        mode = qso.get("Mode")
-        if mode in mode_totals:
-            mode_totals[mode] += 1
-
-    # Build DataFrame
-    df = pd.DataFrame({
-        "Mode": list(mode_totals.keys()),
-        "QSOs": list(mode_totals.values())
-    })
-
-    # Remove zero rows
-    df = df[df["QSOs"] > 0].reset_index(drop=True)
+@timed("data")
+def get_qsos_per_band(activation_data):
+    return _column_sums(activation_data, ACTIVATOR_BAND_KEYS, "Band", ACTIVATOR_BAND_ORDER)
 
-    # Apply correct ordering
-    df["Mode"] = pd.Categorical(df["Mode"], categories=mode_order, ordered=True)
-    df = df.sort_values("Mode").reset_index(drop=True)
+@timed("data")
+def get_qsos_per_band_chaser(chaser_data):
+    return _value_counts(chaser_data, "Band", CHASER_BAND_ORDER)
 
-    # Most popular band
-    if not df.empty:
-        top = df.loc[df["QSOs"].idxmax()]
-        most_popular_mode = top["Mode"]
-        most_popular_mode_qsos = int(top["QSOs"])
-    else:
-        most_popular_mode = None
-        most_popular_mode_qsos = 0
+@timed("data")
+def get_qsos_per_mode(activation_data):
+    return _column_sums(activation_data, ACTIVATOR_MODE_KEYS, "Mode", ACTIVATOR_MODE_ORDER)
 
-    return df, most_popular_mode, most_popular_mode_qsos
+@timed("data")
+def get_qsos_per_mode_chaser(chaser_data):
+    return _value_counts(chaser_data, "Mode", CHASER_MODE_ORDER)
 
 
+@timed("data")
 def get_activator_qso_stats(activation_data):
     qso_total = 0
     activation_count = 0
@@ -334,21 +348,79 @@ def get_activator_qso_stats(activation_data):
 
     return qso_total, average_qsos
 
+@timed("data")
 def fetch_summit_elevation(summit_code: str) -> int:
 
-    summit_code = summit_code.strip().upper()
+    return int(_lookup_elevations([summit_code])[0])
+
+@timed("data")
+def build_summit_index() -> np.ndarray:
+    codes = []
+    elevations = []
+    signature = file_signature(SUMMITSLIST_CSV)
 
     with open(SUMMITSLIST_CSV, newline="", encoding="utf-8") as f:
+        # The published list starts with a title line above the header
+        first_line = f.readline()
+        if "SummitCode" in first_line:
+            f.seek(0)
+
         reader = csv.DictReader(f)
         for row in reader:
-            if row["SummitCode"].upper() == summit_code:
-                try:
-                    return int(row["AltM"])
-                except (KeyError, ValueError):
-                    return 0
+            try:
+                elevation = int(row["AltM"])
+            except (KeyError, ValueError):
+                elevation = 0
+
+            codes.append(row["SummitCode"].strip().upper().encode("utf-8"))
+            elevations.append(elevation)
+
+    codes = np.array(codes, dtype=bytes)
+    order = np.argsort(codes, kind="stable")
+
+    index = np.empty(len(codes), dtype=[("SummitCode", codes.dtype), ("AltM", "<i4")])
+    index["SummitCode"] = codes[order]
+    index["AltM"] = np.array(elevations, dtype="<i4")[order]
+
+    write_table(SUMMIT_INDEX_FILE, index, SUMMITSLIST_CSV, signature)
+    return index
+
+def _read_summit_index() -> np.ndarray:
+    index = load_table(SUMMIT_INDEX_FILE, SUMMITSLIST_CSV)
+    if index is not None:
+        return index
 
-    return 0
+    if not SUMMITSLIST_CSV.exists():
+        return np.zeros(0, dtype=[("SummitCode", "S1"), ("AltM", "<i4")])
+
+    return build_summit_index()
+
+def load_summit_index() -> np.ndarray:
+    return _load_resident(
+        "summit_index",
+        (SUMMITSLIST_CSV, SUMMIT_INDEX_FILE),
+        _read_summit_index
+    )
+
+def _lookup_elevations(summit_codes) -> np.ndarray:
+    index = load_summit_index()
+    if len(index) == 0 or not summit_codes:
+        return np.zeros(len(summit_codes), dtype=np.int64)
+
+    keys = np.array(
+        [code.strip().upper().encode("utf-8") for code in summit_codes],
+        dtype=bytes
+    )
+    codes = index["SummitCode"]
 
+    # Sorted codes: binary search, then confirm the exact match
+    positions = np.searchsorted(codes, keys)
+    positions = np.minimum(positions, len(codes) - 1)
+    found = codes[positions] == keys
+
+    return np.where(found, index["AltM"][positions], 0).astype(np.int64)
+
+@timed("data")
 def count_unique_summits(chaser_data) -> int:
 
     unique_summits = set()
@@ -360,22 +432,265 @@ def count_unique_summits(chaser_data) -> int:
 
     return len(unique_summits)
 
-def fetch_user_id_honor_roll(callsign: str) -> str | None:
-    callsign = callsign.upper().strip()
+def _build_callsign_index() -> dict:
+    index = {}
 
-    for file_path in (HONOR_ROLL_FILE, CHASER_HONOR_ROLL_FILE):
-        if not file_path.exists():
+    for table_path, source_path in ((HONOR_ROLL_TABLE_FILE, HONOR_ROLL_FILE),
+                                    (CHASER_HONOR_ROLL_TABLE_FILE, CHASER_HONOR_ROLL_FILE)):
+        table = load_honor_roll_table(table_path, source_path)
+        if table is None:
             continue
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        # Earlier rolls win, matching the old lookup order
+        for callsign, user_id in zip(table["Callsign"].tolist(), table["UserID"].tolist()):
+            if callsign and user_id >= 0:
+                index.setdefault(callsign.decode("utf-8"), user_id)
+
+    return index
+
+# UserIDs don't change between years, so the current rolls serve every year
+@timed("data")
+def fetch_user_id_honor_roll(callsign: str) -> str | None:
+    index = _load_resident(
+        "callsign_index",
+        (HONOR_ROLL_FILE, CHASER_HONOR_ROLL_FILE, HONOR_ROLL_TABLE_FILE, CHASER_HONOR_ROLL_TABLE_FILE),
+        _build_callsign_index
+    )
+
+    return index.get(callsign.upper().strip())
+
+
+# -----------------------------
+# Single-pass profiles
+# -----------------------------
+@dataclass(frozen=True)
+class UserYearProfile:
+    role: str
+    total_points: int
+    qso_total: int
+    percentile: float | None
+    bucket: str | None
+    band_totals: tuple
+    most_popular_band: str | None
+    most_popular_band_qsos: int
+    mode_totals: tuple
+    most_popular_mode: str | None
+    most_popular_mode_qsos: int
+    # Activator only
+    num_activations: int = 0
+    average_qsos: float = 0.0
+    most_qsos_summit: str | None = None
+    most_qsos: int = 0
+    popular_month: str | None = None
+    season: str | None = None
+    popular_month_count: int = 0
+    total_elevation: int | None = 0
+    num_s2s_qsos: int = 0
+    total_s2s_points: int = 0
+    # Chaser only
+    unique_summits: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: str) -> "UserYearProfile":
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def from_dict(cls, fields: dict) -> "UserYearProfile":
+        fields = dict(fields)
+        fields["band_totals"] = tuple(tuple(row) for row in fields["band_totals"])
+        fields["mode_totals"] = tuple(tuple(row) for row in fields["mode_totals"])
+        return cls(**fields)
+
+def _rank_totals(totals, order):
+    # (name, QSOs) rows in display order, zero rows dropped, plus the first
+    # highest row in that order
+    rows = tuple((name, totals[name]) for name in order if totals.get(name, 0) > 0)
+    if not rows:
+        return rows, None, 0
+
+    top_name, top_qsos = max(rows, key=lambda row: row[1])
+    return rows, top_name, int(top_qsos)
+
+class ActivatorProfileAggregator:
+    # Accepts activations (and S2S QSOs) one at a time, so a log can be
+    # aggregated while it is still streaming in
+
+    def __init__(self, year=CURRENT_YEAR):
+        self.year = year
+        self.total_points = 0
+        self.num_activations = 0
+        self.qso_total = 0
+        self.qso_activations = 0
+        self.most_qsos_activation = None
+        self.month_counts = Counter()
+        self.summit_codes = []
+        self.band_totals = dict.fromkeys(ACTIVATOR_BAND_KEYS.values(), 0)
+        self.mode_totals = dict.fromkeys(ACTIVATOR_MODE_KEYS.values(), 0)
+        self.num_s2s_qsos = 0
+        self.total_s2s_points = 0
+
+    def add(self, activation):
+        self.num_activations += 1
+        self.total_points = max(self.total_points, activation.get("Total", 0))
 
-            for entry in data:
-                if entry.get("Callsign", "").upper() == callsign:
-                    return entry.get("UserID")
+        qsos = activation.get("QSOs")
+        if qsos is not None:
+            self.qso_total += qsos
+            self.qso_activations += 1
+            if self.most_qsos_activation is None or qsos > self.most_qsos_activation["QSOs"]:
+                self.most_qsos_activation = {"Summit": activation.get("Summit"), "QSOs": qsos}
 
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Error reading {file_path}: {e}")
+        date_str = activation.get("ActivationDate")
+        if date_str:
+            self.month_counts[date_str[:7]] += 1
+
+        if activation.get("SummitCode"):
+            self.summit_codes.append(activation["SummitCode"])
+
+        for key, band in ACTIVATOR_BAND_KEYS.items():
+            self.band_totals[band] += activation.get(key, 0)
+        for key, mode in ACTIVATOR_MODE_KEYS.items():
+            self.mode_totals[mode] += activation.get(key, 0)
+
+    def add_s2s(self, qso):
+        self.num_s2s_qsos += 1
+        self.total_s2s_points = max(self.total_s2s_points, qso.get("Total", 0))
+
+    @timed("data", "ActivatorProfileAggregator.build")
+    def build(self, deferred=False) -> UserYearProfile:
+        # deferred leaves percentile, bucket and total_elevation as None;
+        # they need the honor-roll and summit indexes loaded, so the app
+        # evaluates them separately when a slide needs them
+        popular_month, season, popular_month_count = None, None, 0
+        if self.month_counts:
+            month_key, popular_month_count = self.month_counts.most_common(1)[0]
+            month_date = datetime.strptime(month_key, "%Y-%m")
+            popular_month = month_date.strftime("%B %Y")
+            season = _season_for_month(month_date.month)
+
+        bands, most_popular_band, most_popular_band_qsos = _rank_totals(self.band_totals, ACTIVATOR_BAND_ORDER)
+        modes, most_popular_mode, most_popular_mode_qsos = _rank_totals(self.mode_totals, ACTIVATOR_MODE_ORDER)
+        percentile, bucket, total_elevation = None, None, None
+        if not deferred:
+            percentile, bucket = get_percentile_bucket(self.total_points, self.year)
+            total_elevation = int(_lookup_elevations(self.summit_codes).sum())
+        most_qsos_activation = self.most_qsos_activation or {"Summit": None, "QSOs": 0}
+
+        return UserYearProfile(
+            role="Activator",
+            total_points=self.total_points,
+            qso_total=self.qso_total,
+            percentile=percentile,
+            bucket=bucket,
+            band_totals=bands,
+            most_popular_band=most_popular_band,
+            most_popular_band_qsos=most_popular_band_qsos,
+            mode_totals=modes,
+            most_popular_mode=most_popular_mode,
+            most_popular_mode_qsos=most_popular_mode_qsos,
+            num_activations=self.num_activations,
+            average_qsos=round(self.qso_total / self.qso_activations, 2) if self.qso_activations else 0.0,
+            most_qsos_summit=most_qsos_activation["Summit"],
+            most_qsos=most_qsos_activation["QSOs"],
+            popular_month=popular_month,
+            season=season,
+            popular_month_count=popular_month_count,
+            total_elevation=total_elevation,
+            num_s2s_qsos=self.num_s2s_qsos,
+            total_s2s_points=self.total_s2s_points
+        )
+
+class ChaserProfileAggregator:
+    # QSOs are buffered and counted a chunk at a time with pandas; a chaser
+    # log can run to 100k QSOs, where per-QSO Counter updates dominated
+
+    def __init__(self, year=CURRENT_YEAR):
+        self.year = year
+        self.total_points = 0
+        self.qso_total = 0
+        self.unique_summits = set()
+        self.band_totals = Counter()
+        self.mode_totals = Counter()
+        self._pending = []
+
+    def add(self, qso):
+        self._pending.append(qso)
+        if len(self._pending) >= AGGREGATE_CHUNK_ROWS:
+            self._flush()
+
+    def extend(self, qsos):
+        # A whole log at once, sliced straight into chunks
+        self._flush()
+        for start in range(0, len(qsos), AGGREGATE_CHUNK_ROWS):
+            self._count(qsos[start:start + AGGREGATE_CHUNK_ROWS])
+
+    def _flush(self):
+        if self._pending:
+            self._count(self._pending)
+            self._pending = []
+
+    def _count(self, qsos):
+        frame = load_log_frame(qsos, list(CHASER_LOG_FIELDS))
+
+        self.qso_total += len(frame)
+        top_total = frame["Total"].max()
+        if pd.notna(top_total):
+            self.total_points = max(self.total_points, int(top_total))
+        self.band_totals.update(frame["Band"].value_counts().to_dict())
+        self.mode_totals.update(frame["Mode"].value_counts().to_dict())
+        self.unique_summits.update(frame["SummitCode"].unique())
+        self.unique_summits -= {None, ""}
+
+    @timed("data", "ChaserProfileAggregator.build")
+    def build(self, deferred=False) -> UserYearProfile:
+        self._flush()
+        bands, most_popular_band, most_popular_band_qsos = _rank_totals(self.band_totals, CHASER_BAND_ORDER)
+        modes, most_popular_mode, most_popular_mode_qsos = _rank_totals(self.mode_totals, CHASER_MODE_ORDER)
+        percentile, bucket = None, None
+        if not deferred:
+            percentile, bucket = get_chaser_percentile_bucket(self.total_points, self.year)
+
+        return UserYearProfile(
+            role="Chaser",
+            total_points=self.total_points,
+            qso_total=self.qso_total,
+            percentile=percentile,
+            bucket=bucket,
+            band_totals=bands,
+            most_popular_band=most_popular_band,
+            most_popular_band_qsos=most_popular_band_qsos,
+            mode_totals=modes,
+            most_popular_mode=most_popular_mode,
+            most_popular_mode_qsos=most_popular_mode_qsos,
+            unique_summits=len(self.unique_summits)
+        )
+
+@timed("data")
+def build_activator_profile(activation_data, s2s_data=(), deferred=False, year=CURRENT_YEAR) -> UserYearProfile:
+    aggregator = ActivatorProfileAggregator(year)
 
-    return None
\ No newline at end of file
+    for activation in activation_data:
+        aggregator.add(activation)
+    for qso in s2s_data:
+        aggregator.add_s2s(qso)
+
+    return aggregator.build(deferred)
+
+@timed("data")
+def build_chaser_profile(chaser_data, deferred=False, year=CURRENT_YEAR) -> UserYearProfile:
+    aggregator = ChaserProfileAggregator(year)
+    aggregator.extend(chaser_data)
+    return aggregator.build(deferred)
+
+def build_profile(role, activation_data=(), s2s_data=(), chaser_data=(), deferred=False, year=CURRENT_YEAR) -> UserYearProfile:
+    if role == "Activator":
+        return build_activator_profile(activation_data, s2s_data, deferred, year)
+    return build_chaser_profile(chaser_data, deferred, year)
+
+def is_empty_profile(profile: UserYearProfile) -> bool:
+    if profile.role == "Activator":
+        return profile.num_activations == 0
+    return profile.qso_total == 0
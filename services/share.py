@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from services.artifacts import atomic_write
+from services.telemetry import count, timed
+
+# Rendered cards, served by Streamlit's static file server (see .streamlit/config.toml)
+SHARE_CARD_DIR = Path("static/share_cards")
+SHARE_CARD_URL = "app/static/share_cards"
+LOGO_FILE = Path("data/logo.png")
+# Part of every key, so a layout change never serves an old card
+SHARE_CARD_LAYOUT = 1
+# Cards are ~65 KB; past this many, the least recently viewed are deleted
+SHARE_CARD_MAX_FILES = 2000
+
+CARD_WIDTH = 840
+CARD_PADDING = 56
+CARD_RADIUS = 48
+CARD_GRADIENTS = {
+    "Activator": ((0x1E, 0x3C, 0x72), (0x2A, 0x52, 0x98)),
+    "Chaser": ((0x7B, 0x2C, 0x2C), (0xC0, 0x6C, 0x30)),
+}
+
+def share_card_key(callsign, role, year, metrics):
+    # metrics: ordered (label, value) pairs shown on the card
+    metrics_hash = hashlib.sha256(json.dumps(metrics, default=str).encode()).hexdigest()
+    key = json.dumps([SHARE_CARD_LAYOUT, callsign, role, year, metrics_hash])
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+def share_card_url(key):
+    return f"{SHARE_CARD_URL}/{key}.png"
+
+@lru_cache(maxsize=None)
+def _font(size, bold=False):
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+@lru_cache(maxsize=1)
+def _logo(width):
+    logo = Image.open(LOGO_FILE).convert("RGBA")
+    return logo.resize((width, round(logo.height * width / logo.width)), Image.LANCZOS)
+
+def _gradient(width, height, start, end):
+    # Same direction as the CSS linear-gradient(135deg, ...) it replaces
+    x, y = np.meshgrid(np.arange(width), np.arange(height))
+    t = ((x + y) / (width + height - 2))[..., None]
+    pixels = np.array(start) * (1 - t) + np.array(end) * t
+    return Image.fromarray(pixels.astype(np.uint8), "RGB")
+
+def _draw_centered(draw, x, y, text, font, fill="white"):
+    # Anchored on the ascender so descenders don't shift lines out of step
+    draw.text((x, y), text, font=font, fill=fill, anchor="ma")
+    return y + font.size
+
+@timed("share")
+def render_share_card(callsign, role, year, metrics):
+    logo = _logo(180)
+    column_width = (CARD_WIDTH - 2 * CARD_PADDING) // 2
+    row_height = 150
+    grid_top = CARD_PADDING + logo.height + 130
+    height = grid_top + row_height * ((len(metrics) + 1) // 2) + 40 + CARD_PADDING
+
+    card = _gradient(CARD_WIDTH, height, *CARD_GRADIENTS[role]).convert("RGBA")
+    card.alpha_composite(logo, ((CARD_WIDTH - logo.width) // 2, CARD_PADDING))
+
+    draw = ImageDraw.Draw(card)
+    _draw_centered(draw, CARD_WIDTH / 2, CARD_PADDING + logo.height + 40, callsign, _font(56, bold=True))
+
+    for i, (label, value) in enumerate(metrics):
+        x = CARD_PADDING + column_width * (i % 2) + column_width / 2
+        y = grid_top + row_height * (i // 2)
+        y = _draw_centered(draw, x, y, label, _font(34, bold=True))
+        _draw_centered(draw, x, y + 16, str(value), _font(32))
+
+    _draw_centered(
+        draw, CARD_WIDTH / 2, height - CARD_PADDING - 28,
+        f"SOTA {role} Unwrapped {year}", _font(28), fill=(255, 255, 255, 217)
+    )
+
+    mask = Image.new("L", card.size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, card.width - 1, card.height - 1), CARD_RADIUS, fill=255)
+    card.putalpha(mask)
+    return card
+
+def _prune_share_cards():
+    # Oldest first by mtime, which every view refreshes
+    cards = []
+    for entry in os.scandir(SHARE_CARD_DIR):
+        if entry.name.endswith(".png") and not entry.name.startswith("."):
+            try:
+                cards.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:
+                continue
+
+    cards.sort()
+    for _, path in cards[:max(0, len(cards) - SHARE_CARD_MAX_FILES)]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        count("share_card", "evicted")
+
+def get_share_card(callsign, role, year, metrics):
+    # Content-addressed: a card is rendered once, every later view only
+    # touches the file so pruning keeps the cards still being looked at
+    key = share_card_key(callsign, role, year, metrics)
+    path = SHARE_CARD_DIR / f"{key}.png"
+    try:
+        os.utime(path)
+        count("share_card", "hit")
+        return key, path
+    except FileNotFoundError:
+        pass
+
+    count("share_card", "miss")
+    card = render_share_card(callsign, role, year, metrics)
+
+    # Concurrent sessions never serve a partial PNG
+    with atomic_write(path) as f:
+        card.save(f, "PNG", optimize=True)
+
+    _prune_share_cards()
+    return key, path
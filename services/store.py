@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+# On-disk response cache shared by every Streamlit worker on the host
+CACHE_DB = Path("data/cache.sqlite3")
+# Precomputed per-user summaries written by update_honor_roll.py
+SUMMARY_DB = Path("data/summaries.sqlite3")
+
+_local = threading.local()
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    expires_at: float | None
+
+    def is_fresh(self) -> bool:
+        return self.expires_at is None or time.time() < self.expires_at
+
+_RESPONSES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        endpoint TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (endpoint, user_id, year)
+    )
+"""
+
+_SUMMARIES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS summaries (
+        user_id TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        profile TEXT NOT NULL,
+        computed_at REAL NOT NULL,
+        PRIMARY KEY (user_id, year, role)
+    )
+"""
+
+def _connect(path: Path = None, schema: str = _RESPONSES_SCHEMA) -> sqlite3.Connection:
+    path = path or CACHE_DB
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is not None:
+        return conn
+
+    path.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+    # WAL lets readers in other processes carry on while one writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(schema)
+
+    connections[path] = conn
+    return conn
+
+def _expiry(ttl: float | None) -> float | None:
+    return None if ttl is None else time.time() + ttl
+
+def get_response(endpoint: str, user_id, year: int) -> CachedResponse | None:
+    row = _connect().execute(
+        "SELECT body, etag, last_modified, fetched_at, expires_at FROM responses "
+        "WHERE endpoint = ? AND user_id = ? AND year = ?",
+        (endpoint, str(user_id), year)
+    ).fetchone()
+
+    return CachedResponse(*row) if row else None
+
+def put_response(endpoint: str, user_id, year: int, body: str,
+                 etag: str | None, last_modified: str | None, ttl: float | None) -> None:
+    # fetched_at only moves when the body does, so an upstream without ETags
+    # doesn't invalidate everything keyed on the version at every refetch
+    _connect().execute(
+        "INSERT INTO responses "
+        "(endpoint, user_id, year, body, etag, last_modified, fetched_at, expires_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (endpoint, user_id, year) DO UPDATE SET "
+        "body = excluded.body, etag = excluded.etag, last_modified = excluded.last_modified, "
+        "expires_at = excluded.expires_at, "
+        "fetched_at = CASE WHEN body = excluded.body THEN fetched_at ELSE excluded.fetched_at END",
+        (endpoint, str(user_id), year, body, etag, last_modified, time.time(), _expiry(ttl))
+    )
+
+def touch_response(endpoint: str, user_id, year: int, ttl: float | None) -> None:
+    # The upstream confirmed our copy (304), so start a new TTL window.
+    # fetched_at is left alone: it marks when the body last changed.
+    _connect().execute(
+        "UPDATE responses SET expires_at = ? "
+        "WHERE endpoint = ? AND user_id = ? AND year = ?",
+        (_expiry(ttl), endpoint, str(user_id), year)
+    )
+
+def get_version(endpoint: str, user_id, year: int) -> float | None:
+    row = _connect().execute(
+        "SELECT fetched_at FROM responses WHERE endpoint = ? AND user_id = ? AND year = ?",
+        (endpoint, str(user_id), year)
+    ).fetchone()
+
+    return row[0] if row else None
+
+def get_summary(user_id, year: int, role: str, max_age: float | None = None) -> str | None:
+    # A summary computed more than max_age seconds ago reads as missing
+    row = _connect(SUMMARY_DB, _SUMMARIES_SCHEMA).execute(
+        "SELECT profile, computed_at FROM summaries WHERE user_id = ? AND year = ? AND role = ?",
+        (str(user_id), year, role)
+    ).fetchone()
+
+    if row is None or (max_age is not None and time.time() - row[1] > max_age):
+        return None
+    return row[0]
+
+def put_summaries(rows) -> None:
+    # rows: (user_id, year, role, profile JSON)
+    now = time.time()
+    conn = _connect(SUMMARY_DB, _SUMMARIES_SCHEMA)
+    with conn:
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT OR REPLACE INTO summaries (user_id, year, role, profile, computed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(str(user_id), year, role, profile, now) for user_id, year, role, profile in rows]
+        )
@@ -0,0 +1,206 @@
+import atexit
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from services.artifacts import atomic_write
+
+# Spans and cache counters for the hot paths. Spans go to a JSON-lines log
+# and, with the counters, into a Prometheus text file that node_exporter's
+# textfile collector (or anything else) can scrape; p50/p99 per stage come
+# from histogram_quantile() over the span buckets.
+# Only a process that calls start_export() (the Streamlit server) writes
+# files; anything else importing services keeps its spans in memory. Each
+# server worker is keyed by a stable id ({worker} in the paths, and a
+# worker label on every series), so workers never clobber each other's
+# counters, and a restarted worker takes over its own files.
+ENABLED = os.environ.get("SOTA_TELEMETRY", "1") != "0"
+EXPORT_INTERVAL = 15.0
+WORKER = None
+TELEMETRY_LOG = None
+METRICS_FILE = None
+
+# Span latency buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("sota_unwrapped.telemetry")
+
+_lock = threading.Lock()
+_spans = {}     # (stage, name) -> [bucket counts..., +Inf count, sum, errors]
+_counters = {}  # (cache, result) -> count
+_last_export = time.monotonic()
+_local = threading.local()
+
+# Silent until start_export() gives it a file
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+
+def start_export(worker) -> None:
+    global WORKER, TELEMETRY_LOG, METRICS_FILE
+
+    if not ENABLED or WORKER is not None:
+        return
+    WORKER = str(worker)
+    TELEMETRY_LOG = Path(os.environ.get("SOTA_TELEMETRY_LOG", "data/telemetry.{worker}.log").format(worker=WORKER))
+    METRICS_FILE = Path(os.environ.get("SOTA_METRICS_FILE", "data/metrics.{worker}.prom").format(worker=WORKER))
+
+    TELEMETRY_LOG.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(TELEMETRY_LOG, maxBytes=10_000_000, backupCount=3, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    atexit.register(_remove_metrics)
+
+def _remove_metrics():
+    # A stopped worker's series must not linger in the textfile collector
+    try:
+        METRICS_FILE.unlink()
+    except FileNotFoundError:
+        pass
+
+def _record(stage, name, seconds, ok):
+    global _last_export
+
+    with _lock:
+        span = _spans.get((stage, name))
+        if span is None:
+            span = _spans[(stage, name)] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+        span[bisect_left(BUCKETS, seconds)] += 1
+        span[-2] += seconds
+        if not ok:
+            span[-1] += 1
+
+        due = METRICS_FILE is not None and time.monotonic() - _last_export >= EXPORT_INTERVAL
+        if due:
+            _last_export = time.monotonic()
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            "ts": round(time.time(), 3),
+            "event": "span",
+            "stage": stage,
+            "name": name,
+            "ms": round(seconds * 1000, 3),
+            "ok": ok
+        }))
+
+    if due:
+        export_metrics()
+
+@contextmanager
+def span(stage, name):
+    if not ENABLED:
+        yield
+        return
+
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        _record(stage, name, time.perf_counter() - start, ok)
+
+def timed(stage, name=None):
+    # Decorator form of span() for plain and async functions
+    def decorate(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage, span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage, span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+def count(cache, result):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[(cache, result)] = _counters.get((cache, result), 0) + 1
+
+def cache_miss():
+    # Called first thing in the body of a @counted_cache function: Streamlit
+    # only runs the body on a miss
+    _local.miss = True
+
+def counted_cache(cache):
+    # Goes above @st.cache_data / @st.cache_resource, which give no hit signal
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            outer = getattr(_local, "miss", None)
+            _local.miss = False
+            try:
+                result = func(*args, **kwargs)
+                count(cache, "miss" if _local.miss else "hit")
+                return result
+            finally:
+                _local.miss = outer
+        return wrapper
+
+    return decorate
+
+def _labels(**labels):
+    if WORKER is not None:
+        labels = {"worker": WORKER, **labels}
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+def render_metrics() -> str:
+    with _lock:
+        spans = {key: list(value) for key, value in _spans.items()}
+        counters = dict(_counters)
+
+    lines = [
+        "# HELP sota_span_seconds Time spent in instrumented fetch, compute and render spans",
+        "# TYPE sota_span_seconds histogram"
+    ]
+    for (stage, name), span in sorted(spans.items()):
+        labels = _labels(stage=stage, name=name)
+        cumulative = 0
+        for bound, hits in zip(BUCKETS + ("+Inf",), span):
+            cumulative += hits
+            lines.append(f'sota_span_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"sota_span_seconds_sum{{{labels}}} {span[-2]:.6f}")
+        lines.append(f"sota_span_seconds_count{{{labels}}} {cumulative}")
+
+    lines += [
+        "# HELP sota_span_errors_total Spans that ended in an exception",
+        "# TYPE sota_span_errors_total counter"
+    ]
+    for (stage, name), span in sorted(spans.items()):
+        lines.append(f"sota_span_errors_total{{{_labels(stage=stage, name=name)}}} {span[-1]}")
+
+    lines += [
+        "# HELP sota_cache_requests_total Cache lookups by result",
+        "# TYPE sota_cache_requests_total counter"
+    ]
+    for (cache, result), value in sorted(counters.items()):
+        lines.append(f"sota_cache_requests_total{{{_labels(cache=cache, result=result)}}} {value}")
+
+    return "\n".join(lines) + "\n"
+
+def export_metrics(path: Path = None) -> None:
+    path = path or METRICS_FILE
+    if not ENABLED or path is None:
+        return
+
+    # Written whole and renamed, so a scrape never reads a partial file
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        f.write(render_metrics())
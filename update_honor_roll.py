@@ -1,5 +1,109 @@
-from services.api import fetch_honor_roll, fetch_chaser_honor_roll
+import argparse
+import asyncio
+import httpx
+import sys
+from functools import partial
 
-fetch_honor_roll()
+from services.api import (
+    fetch_honor_roll_async,
+    fetch_chaser_honor_roll_async,
+    fetch_log_async,
+    run_async,
+    stream_log_async
+)
+from services.data import CURRENT_YEAR, ActivatorProfileAggregator, ChaserProfileAggregator, is_empty_profile
+from services.store import put_summaries
 
-fetch_chaser_honor_roll()
\ No newline at end of file
+# Upstream requests in flight at once while walking the rolls
+FETCH_CONCURRENCY = 8
+SUMMARY_BATCH_SIZE = 200
+
+async def summarize(user_id, role, year, semaphore):
+    # Logs are streamed straight into the profile aggregators and skip the
+    # response store, so no user's full log is ever held in memory. A failed
+    # fetch raises: writing a partial profile would shadow the live logs.
+    async with semaphore:
+        try:
+            if role == "Activator":
+                aggregator, s2s = await asyncio.gather(
+                    stream_log_async("activator", user_id, year, partial(ActivatorProfileAggregator, year)),
+                    fetch_log_async("s2s", user_id, year, cache=False)
+                )
+                for qso in s2s:
+                    aggregator.add_s2s(qso)
+            else:
+                aggregator = await stream_log_async("chaser", user_id, year, partial(ChaserProfileAggregator, year))
+        except httpx.HTTPError as e:
+            print(f"Skipped {role.lower()} {user_id} ({year}): {e!r}", file=sys.stderr)
+            raise
+
+    profile = aggregator.build()
+    if is_empty_profile(profile):
+        return None
+    return user_id, year, role, profile.to_json()
+
+async def summarize_all(users, year):
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    written = 0
+    skipped = 0
+    rows = []
+
+    for task in asyncio.as_completed([summarize(user_id, role, year, semaphore) for user_id, role in users]):
+        try:
+            row = await task
+        except httpx.HTTPError:
+            skipped += 1
+            continue
+        if row is None:
+            continue
+
+        rows.append(row)
+        if len(rows) >= SUMMARY_BATCH_SIZE:
+            await asyncio.to_thread(put_summaries, rows)
+            written += len(rows)
+            rows = []
+
+    await asyncio.to_thread(put_summaries, rows)
+    return written + len(rows), skipped
+
+def precompute_summaries(honor_roll, chaser_honor_roll, year):
+    users = [(entry["UserID"], "Activator") for entry in honor_roll if "UserID" in entry]
+    users += [(entry["UserID"], "Chaser") for entry in chaser_honor_roll if "UserID" in entry]
+
+    written, skipped = run_async(summarize_all(users, year))
+
+    print(f"Stored {written} {year} summaries for {len(users)} honor-roll entries")
+    if skipped:
+        print(f"Skipped {skipped} entries after upstream errors", file=sys.stderr)
+    return skipped
+
+async def refresh_honor_rolls(year):
+    return await asyncio.gather(fetch_honor_roll_async(year), fetch_chaser_honor_roll_async(year))
+
+def main():
+    # Rolls only by default: cheap enough to run from cron every few minutes
+    parser = argparse.ArgumentParser(description="Refresh the honor rolls and, optionally, precomputed summaries")
+    parser.add_argument(
+        "--summaries",
+        action="store_true",
+        help="also precompute every honor-roll user's summary (one log fetch per user; run rarely)"
+    )
+    # Still accepted from existing cron entries; it is the default now
+    parser.add_argument("--rolls-only", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=CURRENT_YEAR,
+        help=f"year to refresh (default {CURRENT_YEAR}); closed years only need one run"
+    )
+    args = parser.parse_args()
+
+    honor_roll, chaser_honor_roll = run_async(refresh_honor_rolls(args.year))
+
+    if args.summaries and not args.rolls_only:
+        # Non-zero exit when any user was skipped, so cron reports the run
+        if precompute_summaries(honor_roll, chaser_honor_roll, args.year):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()